@@ -1,47 +1,7 @@
-# Helper Functions for Evaluators
-def is_near_walls(move, walls):
-    """
-    Checks if a move is on near the edges of the board
-
-    Parameters
-    ----------
-    move : (int, int)
-        The input move on the board
-
-    walls : list(list(tuples))
-        A nested list of tuples for each edge of the board
-
-    Returns
-    -------
-    bool
-        Returns True if a move lies along the edges else False
-    """
-    for wall in walls:
-        if move in wall:
-            return True
-    return False
-
-
-def is_in_corners(move, corners):
-    """
-        Checks if a move is in the corners of the board
-
-        Parameters
-        ----------
-        move : (int, int)
-            The input move on the board
-
-        corners : list(tuples)
-            A list of tuples for each corner of the board
-
-        Returns
-        -------
-        bool
-            Returns True if a move lies in a corner of the board else False
-    """
-    return move in corners
+from isolation.geometry import INTERIOR, CORNER
 
 
+# Helper Functions for Evaluators
 def percent_occupied(game):
     """
             Checks if a move is in the corners of the board
@@ -56,8 +16,7 @@ def percent_occupied(game):
             int
                 The percentage of occupied space in the board
         """
-    blank_spaces = game.get_blank_spaces()
-    return int((len(blank_spaces) / (game.width * game.height)) * 100)
+    return int((game.blank_count() / (game.width * game.height)) * 100)
 
 
 # Evaluator Functions
@@ -82,15 +41,11 @@ def evaluator_aggresively_chase_opponent(game, player):
         float
             The heuristic value of the current game state
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
-    return float(abs(own_moves - 2 * opp_moves))
+    return float(abs(len(own_moves) - 2 * len(opp_moves)))
 
 
 def evaluator_check_near_walls(game, player):
@@ -120,41 +75,35 @@ def evaluator_check_near_walls(game, player):
         float
             The heuristic value of the current game state
     """
-    walls = [
-        [(0, i) for i in range(game.width)],
-        [(i, 0) for i in range(game.height)],
-        [(game.width - 1, i) for i in range(game.width)],
-        [(i, game.height - 1) for i in range(game.height)]
-    ]
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
+    geometry = game.geometry
+    cell_class = geometry.cell_class
+    pct = percent_occupied(game)
     own_cum_score = 0
     opp_cum_score = 0
 
     own_moves_left = 0
     opp_moves_left = 0
     for move in own_moves:
-        if is_near_walls(move, walls) and percent_occupied(game) < 50:
+        near_walls = cell_class[geometry.index(move)] != INTERIOR
+        if near_walls and pct < 50:
             own_cum_score += 10
-        elif is_near_walls(move, walls) and percent_occupied(game) > 50 and percent_occupied(game) < 85:
+        elif near_walls and 50 < pct < 85:
             own_cum_score -= 20
-        elif is_near_walls(move, walls) and percent_occupied(game) > 85:
+        elif near_walls and pct > 85:
             own_cum_score -= 30
         else:
             own_moves_left += 5
 
     for move in opp_moves:
-        if is_near_walls(move, walls) and percent_occupied(game) < 50:
+        near_walls = cell_class[geometry.index(move)] != INTERIOR
+        if near_walls and pct < 50:
             opp_cum_score += 10
-        elif is_near_walls(move, walls) and percent_occupied(game) > 50 and percent_occupied(game) < 85:
+        elif near_walls and 50 < pct < 85:
             opp_cum_score -= 20
-        elif is_near_walls(move, walls) and percent_occupied(game) > 85:
+        elif near_walls and pct > 85:
             opp_cum_score -= 30
         else:
             opp_moves_left += 5
@@ -188,32 +137,30 @@ def evaluator_check_in_corners(game, player):
                 float
                     The heuristic value of the current game state
                 """
-    corners = [(0, 0), (0, game.width - 1), (game.height - 1, 0), (game.height - 1, game.width - 1)]
-
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
+    geometry = game.geometry
+    cell_class = geometry.cell_class
+    pct = percent_occupied(game)
     own_cum_score = 0
     opp_cum_score = 0
     own_moves_left = 0
     opp_moves_left = 0
     for move in own_moves:
-        if is_in_corners(move, corners) and percent_occupied(game) < 60:
+        in_corner = cell_class[geometry.index(move)] == CORNER
+        if in_corner and pct < 60:
             own_cum_score += 15
-        elif is_in_corners(move, corners) and percent_occupied(game) > 60:
+        elif in_corner and pct > 60:
             own_cum_score -= 40
         else:
             own_moves_left += 10
 
     for move in opp_moves:
-        if is_in_corners(move, corners) and percent_occupied(game) < 60:
+        in_corner = cell_class[geometry.index(move)] == CORNER
+        if in_corner and pct < 60:
             opp_cum_score += 15
-        elif is_in_corners(move, corners) and percent_occupied(game) > 60:
+        elif in_corner and pct > 60:
             opp_cum_score -= 40
         else:
             opp_moves_left += 10
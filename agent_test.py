@@ -3,16 +3,56 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import copy
+import math
+import os
+import pickle
+import random
+import tempfile
 import unittest
 
+import additional_heuristics
 import isolation
 import game_agent
+import match_stats
+import ratings
 import sample_players
+import tournament
+import tournament_log
 
 from importlib import reload
 import timeit
 
 
+def random_position(player, rng, max_moves=20):
+    """Return a board reached by random moves drawn from `rng`, with
+    `player` to move and at least two legal moves.
+    """
+    while True:
+        num_moves = rng.randint(2, max_moves)
+        players = [player, "Opponent"] if num_moves % 2 == 0 else ["Opponent", player]
+        game = isolation.Board(*players, shuffle=False)
+        for _ in range(num_moves):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        if game.active_player is player and len(game.get_legal_moves()) > 1:
+            return game
+
+
+def fixed_depth_scores(player, seed=0, count=20):
+    """Return the root scores found by `player` (which must have a
+    `depth_limit`) on a seeded series of random positions.
+    """
+    rng = random.Random(seed)
+    scores = []
+    for _ in range(count):
+        player.get_move(random_position(player, rng), None)
+        scores.append(player.root_score)
+    return scores
+
+
 class IsolationTest(unittest.TestCase):
     """Unit tests for isolation agents"""
 
@@ -22,6 +62,393 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def test_bitboard_matches_list_moves(self):
+        for width, height in [(7, 7), (5, 8)]:
+            self.game = isolation.Board(self.player1, self.player2, width, height)
+            list_game = isolation.Board(self.player1, self.player2, width, height, bitboard=False)
+            self.assertEqual(self.game.get_blank_spaces(), list_game.get_blank_spaces())
+            while True:
+                moves = self.game.get_legal_moves()
+                self.assertEqual(sorted(moves), sorted(list_game.get_legal_moves()))
+                self.assertEqual(sorted(self.game.get_legal_moves(self.game.inactive_player)),
+                                 sorted(list_game.get_legal_moves(list_game.inactive_player)))
+                for cell in list_game.get_blank_spaces():
+                    self.assertEqual(self.game.get_open_degree(cell),
+                                     len(list_game._Board__get_moves(cell)))
+                if not moves:
+                    break
+                move = random.choice(moves)
+                self.game.apply_move(move)
+                list_game.apply_move(move)
+
+    def test_get_mobility_matches_legal_moves(self):
+        for _ in range(5):
+            game = isolation.Board(self.player1, self.player2)
+            while True:
+                for player in (self.player1, self.player2):
+                    own_moves, opp_moves, utility = game.get_mobility(player)
+                    self.assertEqual(sorted(own_moves), sorted(game.get_legal_moves(player)))
+                    self.assertEqual(sorted(opp_moves),
+                                     sorted(game.get_legal_moves(game.get_opponent(player))))
+                    self.assertEqual(utility, game.utility(player))
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+
+    def test_seeded_and_unshuffled_move_order(self):
+        first = isolation.Board(self.player1, self.player2, seed=42)
+        second = isolation.Board(self.player1, self.player2, seed=42)
+        fixed = isolation.Board(self.player1, self.player2, shuffle=False)
+        for move in [(3, 3), (2, 2)]:
+            for game in (first, second, fixed):
+                game.apply_move(move)
+        for _ in range(10):
+            self.assertEqual(first.get_legal_moves(), second.get_legal_moves())
+            self.assertEqual(fixed.get_legal_moves(), fixed.copy().get_legal_moves())
+
+    def test_unseeded_board_pickles_and_deep_copies(self):
+        self.game.apply_move((3, 3))
+        for clone in (pickle.loads(pickle.dumps(self.game)), copy.deepcopy(self.game)):
+            self.assertEqual(clone, self.game)
+            self.assertEqual(sorted(clone.get_legal_moves()), sorted(self.game.get_legal_moves()))
+            self.assertIs(clone.random, random._inst)
+
+    def test_zobrist_hash_transpositions(self):
+        opening = [(3, 3), (0, 6)]
+        first, second = self.game.copy(), self.game.copy()
+        for move in opening + [(1, 2), (1, 4), (0, 4), (0, 2), (2, 5), (2, 1), (1, 3), (0, 0)]:
+            first.apply_move(move)
+        for move in opening + [(1, 4), (2, 5), (0, 2), (0, 4), (2, 1), (1, 2), (1, 3), (0, 0)]:
+            second.apply_move(move)
+        self.assertEqual(first, second)
+        self.assertEqual(first.hash(), second.hash())
+        self.assertEqual(len({first: 1, second: 2}), 1)
+
+        # the key is updated incrementally in both directions
+        undo = second.apply_move((2, 1))
+        self.assertNotEqual(first.hash(), second.hash())
+        second.undo_move(undo)
+        self.assertEqual(first.hash(), second.hash())
+
+    def test_undo_move_restores_board(self):
+        history = []
+        snapshots = []
+        while True:
+            moves = self.game.get_legal_moves()
+            if not moves:
+                break
+            snapshots.append(self.game.copy())
+            history.append(self.game.apply_move(random.choice(moves)))
+        while history:
+            self.game.undo_move(history.pop())
+            expected = snapshots.pop()
+            self.assertEqual(self.game._board_state, expected._board_state)
+            self.assertEqual(self.game._occupied, expected._occupied)
+            self.assertEqual(self.game._open_degree, expected._open_degree)
+            self.assertEqual(self.game.blank_count(), len(expected.get_blank_spaces()))
+            self.assertEqual(self.game.move_count, expected.move_count)
+            self.assertIs(self.game.active_player, expected.active_player)
+
+
+class GeometryTest(unittest.TestCase):
+    """Unit tests for the per-size board lookup tables"""
+
+    def assertCells(self, geometry, table, expected):
+        for move, value in expected.items():
+            self.assertEqual(table[geometry.index(move)], value, move)
+
+    def test_cell_class_and_ring_square(self):
+        geometry = isolation.get_geometry(7, 7)
+        corner, edge, interior = isolation.CORNER, isolation.EDGE, isolation.INTERIOR
+        self.assertCells(geometry, geometry.cell_class, {
+            (0, 0): corner, (0, 6): corner, (6, 0): corner, (6, 6): corner,
+            (0, 3): edge, (3, 0): edge, (6, 1): edge, (5, 6): edge,
+            (1, 1): interior, (3, 3): interior, (5, 5): interior, (1, 5): interior})
+        self.assertEqual(geometry.cell_class.count(corner), 4)
+        self.assertEqual(geometry.cell_class.count(edge), 20)
+        self.assertCells(geometry, geometry.ring, {
+            (0, 0): 0, (0, 4): 0, (1, 1): 1, (1, 5): 1, (5, 3): 1,
+            (2, 2): 2, (4, 3): 2, (3, 3): 3})
+
+    def test_cell_class_and_ring_rectangular(self):
+        # 5 columns and 8 rows, so cells are indexed row + col * 8
+        geometry = isolation.get_geometry(5, 8)
+        corner, edge, interior = isolation.CORNER, isolation.EDGE, isolation.INTERIOR
+        self.assertCells(geometry, geometry.cell_class, {
+            (0, 0): corner, (7, 0): corner, (0, 4): corner, (7, 4): corner,
+            (3, 0): edge, (7, 2): edge, (0, 1): edge, (5, 4): edge,
+            (1, 1): interior, (6, 3): interior, (4, 2): interior})
+        self.assertEqual(geometry.cell_class.count(corner), 4)
+        self.assertEqual(geometry.cell_class.count(edge), 2 * (5 - 2) + 2 * (8 - 2))
+        self.assertCells(geometry, geometry.ring, {
+            (0, 2): 0, (7, 3): 0, (1, 3): 1, (6, 1): 1, (3, 2): 2, (4, 2): 2, (6, 2): 1})
+        self.assertEqual(max(geometry.ring), 2)
+
+    def test_wall_and_corner_heuristics(self):
+        # Both players have wall moves and the player to move can reach a
+        # corner; the values are those of the coordinate-list versions of
+        # the heuristics that predate `cell_class`
+        game = isolation.Board("Player1", "Player2", shuffle=False)
+        for move in [(6, 3), (5, 3), (5, 1), (4, 1), (4, 3), (3, 3), (5, 5), (2, 1), (3, 6), (1, 3),
+                     (4, 4), (2, 5), (2, 3)]:
+            game.apply_move(move)
+        for score_fn, expected in [(game_agent.score_wall_corner_aware_differential_open_move, 59.),
+                                   (additional_heuristics.evaluator_check_in_corners, 90.),
+                                   (additional_heuristics.evaluator_check_near_walls, 45.)]:
+            self.assertEqual(score_fn(game, "Player1"), expected)
+            self.assertEqual(score_fn(game, "Player2"), -expected)
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """Unit tests for the alpha-beta transposition table"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.table = game_agent.TranspositionTable(size_mb=0.001)
+
+    def test_replacement_policy(self):
+        key = 12345
+        collision = key + self.table.num_buckets
+        self.table.store(key, 5, 1., game_agent.EXACT, (0, 0))
+        self.table.store(collision, 2, 2., game_agent.LOWER_BOUND, (1, 2))
+        # the shallower result goes to the always-replace slot
+        self.assertEqual(self.table.lookup(key)[1:5], (5, 1., game_agent.EXACT, (0, 0)))
+        self.assertEqual(self.table.lookup(collision)[1:5], (2, 2., game_agent.LOWER_BOUND, (1, 2)))
+
+        # entries from an earlier search give up the depth-preferred slot
+        self.table.new_search()
+        self.table.store(collision + self.table.num_buckets, 1, 3., game_agent.UPPER_BOUND, None)
+        self.assertIsNone(self.table.lookup(key))
+        self.assertIsNotNone(self.table.lookup(collision))
+
+    def test_fixed_depth_scores_match_without_table(self):
+        for depth in (3, 5):
+            with_table = game_agent.AlphaBetaPlayer(score_fn=sample_players.improved_score,
+                                                    tt_size_mb=1, depth_limit=depth)
+            without_table = game_agent.AlphaBetaPlayer(score_fn=sample_players.improved_score,
+                                                       depth_limit=depth)
+            self.assertEqual(fixed_depth_scores(with_table), fixed_depth_scores(without_table))
+
+
+class SearchModeTest(unittest.TestCase):
+    """Fixed-depth equivalence of the alpha-beta search options"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def assertSameScores(self, make_player):
+        for depth in (3, 5):
+            plain = game_agent.AlphaBetaPlayer(score_fn=sample_players.improved_score, depth_limit=depth)
+            self.assertEqual(fixed_depth_scores(make_player(depth)), fixed_depth_scores(plain))
+
+    def test_principal_variation_search(self):
+        self.assertSameScores(lambda depth: game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, pvs=True, depth_limit=depth))
+
+    def test_aspiration_windows(self):
+        self.assertSameScores(lambda depth: game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, aspiration_window=0.5, depth_limit=depth))
+
+    def test_mtdf(self):
+        self.assertSameScores(lambda depth: game_agent.MTDfPlayer(
+            score_fn=sample_players.improved_score, tt_size_mb=1, depth_limit=depth))
+
+    def test_batch_frontier_scoring(self):
+        self.assertSameScores(lambda depth: game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, batch_score_fn=game_agent.batch_improved_score,
+            depth_limit=depth))
+
+
+class EvalCacheTest(unittest.TestCase):
+    """Unit tests for the memoized score function wrapper"""
+
+    def test_hits_and_eviction(self):
+        cache = game_agent.EvalCache(sample_players.improved_score, max_entries=2)
+        game = isolation.Board("Player1", "Player2")
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        child = game.forecast_move((1, 5))
+        self.assertEqual(cache(game, "Player1"), sample_players.improved_score(game, "Player1"))
+        cache(game, "Player1")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache(game, "Player2")
+        cache(child, "Player1")
+        self.assertEqual(len(cache), 2)
+        cache(game, "Player1")
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertEqual(len(pickle.loads(pickle.dumps(cache))), 0)
+
+
+class BatchScoreTest(unittest.TestCase):
+    """Unit tests for the vectorized sibling evaluation"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_batch_matches_scalar_score(self):
+        for _ in range(20):
+            game = isolation.Board("Player1", "Player2")
+            for _ in range(random.randint(1, 30)):
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+            moves = game.get_legal_moves()
+            if not moves:
+                continue
+            for player in ("Player1", "Player2"):
+                expected = [sample_players.improved_score(game.forecast_move(m), player) for m in moves]
+                self.assertEqual(list(game_agent.batch_improved_score(game, moves, player)), expected)
+
+
+class BoardBatchTest(unittest.TestCase):
+    """Unit tests for the structure-of-arrays game batch"""
+
+    def test_batch_matches_boards(self):
+        boards = []
+        for _ in range(20):
+            game = isolation.Board("Player1", "Player2")
+            for _ in range(random.randint(0, 30)):
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+            boards.append(game)
+        batch = isolation.BoardBatch.from_boards(boards)
+        mask = batch.legal_move_mask()
+        for i, game in enumerate(boards):
+            legal = sorted(game.geometry.index(m) for m in game.get_legal_moves())
+            self.assertEqual(list(mask[i].nonzero()[0]), legal)
+            self.assertEqual(bool(batch.terminal()[i]), not legal)
+        winners = batch.playout("greedy")
+        self.assertTrue(batch.terminal().all())
+        self.assertTrue(((winners == 0) | (winners == 1)).all())
+
+
+class RatingsTest(unittest.TestCase):
+    """Unit tests for the Bradley-Terry ratings"""
+
+    def test_incremental_ratings_and_pairing(self):
+        bt = ratings.BradleyTerry()
+        for name in ("A", "B", "C"):
+            bt.add_agent(name)
+        for _ in range(6):
+            bt.add_game("A", "B")
+            bt.add_game("B", "A")
+            bt.add_game("A", "B")
+        self.assertGreater(bt.rating("A"), bt.rating("B"))
+        self.assertIn("C", bt.next_pairing())
+        before = bt.theta.copy()
+        bt.fit()
+        self.assertTrue(abs(bt.theta - before).max() < 1e-3)
+
+
+class MatchStatsTest(unittest.TestCase):
+    """Unit tests for the win rate statistics and early stopping"""
+
+    def test_wilson_interval(self):
+        self.assertEqual(match_stats.wilson_interval(0, 0), (0., 1.))
+        low, high = match_stats.wilson_interval(8, 10)
+        self.assertAlmostEqual(low, 0.4902, places=4)
+        self.assertAlmostEqual(high, 0.9433, places=4)
+        low, high = match_stats.wilson_interval(5, 10, confidence=0.9)
+        self.assertAlmostEqual(low, 1 - high)
+        self.assertAlmostEqual(low, 0.2693, places=4)
+
+    def test_sprt(self):
+        sprt = match_stats.SPRT(confidence=0.95, margin=0.1)
+        self.assertAlmostEqual(sprt.upper, math.log(19))
+        self.assertAlmostEqual(sprt.llr(1, 0), math.log(1.5))
+        self.assertAlmostEqual(sprt.llr(3, 3), 0.)
+        # log(19) / log(1.5) = 7.26 straight wins are needed
+        self.assertFalse(sprt.decided(7, 0))
+        self.assertTrue(sprt.decided(8, 0))
+        self.assertTrue(sprt.decided(0, 8))
+        self.assertFalse(sprt.decided(20, 14))
+
+    def test_stop_rule_checked_between_matches(self):
+        class AlwaysDecided:
+            def decided(self, wins, losses):
+                return True
+
+        cpu = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        test = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+        win_counts = {cpu.player: 0, test.player: 0}
+        _, _, played = tournament.play_round(cpu, [test], win_counts, 3, stop_rule=AlwaysDecided(),
+                                             rng=random.Random(0), time_limit=None)
+        self.assertEqual(played[test.player], 2)
+
+    def test_seeded_node_budget_games_replay(self):
+        cpu = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        test = tournament.Agent(game_agent.AlphaBetaPlayer(score_fn=sample_players.improved_score,
+                                                           node_budget=500), "AB")
+        opening = tournament.random_opening(random.Random(0))
+        fields = ("winner", "move_count", "test_searches", "test_nodes", "test_depth")
+        records = []
+        for state in range(3):
+            random.seed(state)
+            record = tournament.play_game(cpu, test, opening, 1, time_limit=None, seed=0)
+            records.append(tuple(record[field] for field in fields))
+        self.assertEqual(len(set(records)), 1)
+
+
+class TournamentLogTest(unittest.TestCase):
+    """Unit tests for the game log and resumed tournaments"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "games.jsonl")
+
+    def test_incremental_reads(self):
+        reader = tournament_log.LogReader(self.path)
+        self.assertEqual(reader.read(), [])
+        with tournament_log.open_log(self.path) as log:
+            tournament_log.append_record(log, {"match": 0})
+            tournament_log.append_record(log, {"match": 1})
+        self.assertEqual(reader.read(), [{"match": 0}, {"match": 1}])
+        self.assertEqual(reader.read(), [])
+
+        # a half-written line is left for the next read
+        with open(self.path, "a") as log:
+            log.write('{"match": ')
+        self.assertEqual(reader.read(), [])
+        with open(self.path, "a") as log:
+            log.write('2}\n')
+        self.assertEqual(reader.read(), [{"match": 2}])
+
+        # a line cut short by a crash is skipped once the log is reopened
+        with open(self.path, "a") as log:
+            log.write('{"match": 3')
+        with tournament_log.open_log(self.path) as log:
+            tournament_log.append_record(log, {"match": 4})
+        self.assertEqual(reader.read(), [{"match": 4}])
+
+    def test_resume_skips_logged_games(self):
+        cpu = tournament.Agent(sample_players.RandomPlayer(), "Random")
+        test = tournament.Agent(sample_players.GreedyPlayer(), "Greedy")
+
+        def play(log_path, completed=None):
+            win_counts = {cpu.player: 0, test.player: 0}
+            with tournament_log.open_log(log_path) as log:
+                tournament.play_round(cpu, [test], win_counts, 3, log=log, rng=random.Random(0), seed=0,
+                                      completed=completed, time_limit=None)
+            return win_counts
+
+        first = play(self.path)
+        records = tournament_log.LogReader(self.path).read()
+        self.assertEqual(len(records), 6)
+
+        # drop the last two games, as if the run had been interrupted
+        completed = {tournament_log.game_key(record): record for record in records[:4]}
+        resumed_path = self.path + ".resumed"
+        resumed = play(resumed_path, completed)
+        replayed = tournament_log.LogReader(resumed_path).read()
+        self.assertEqual([tournament_log.game_key(record) for record in replayed],
+                         [tournament_log.game_key(record) for record in records[4:]])
+        self.assertEqual(resumed, first)
+
 
 class MinimaxPlayerTest(unittest.TestCase):
     """Unit tests for MinimaxPlayer agents"""
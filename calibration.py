@@ -0,0 +1,116 @@
+"""Calibrate time limits to the speed of the machine.
+
+Wall-clock time limits mean a different amount of search on every
+machine. `calibrate()` times a fixed reference search -- a plain
+fixed-depth alpha-beta search with improved_score, defined here and kept
+frozen so that changes to the agents do not move the measurement -- on a
+fixed suite of positions, and returns the factor by which this machine is
+slower than the reference machine. Multiplying a time limit in "reference
+milliseconds" by the factor gives the wall-clock limit that allows the
+same amount of search as the reference machine would in that time.
+"""
+import random
+import timeit
+
+from isolation import Board
+from sample_players import improved_score
+
+# Throughput of `reference_search` on the default suite, in nodes per
+# second, as measured on the development machine used for this module (a
+# single-core Intel Xeon virtual machine running CPython 3.11). It was not
+# used to choose TIME_LIMIT, which predates calibration; it only defines the
+# "reference millisecond" as the time that machine took to search
+# REFERENCE_NPS / 1000 nodes, so a calibrated time limit allows every
+# machine the search that one would have done in the same limit. Repeated
+# measurements there spread over about +/-15%, mostly from the virtual
+# machine's own speed changing between processes.
+#
+# To re-measure, after any change to the suite, `reference_search` or
+# `Board` (whose speed is part of the measurement): on the development
+# machine, otherwise idle, run
+#     python -c "import calibration; print(calibration.measure_nps())"
+# eight times in separate processes and store the median here. Records
+# logged with different values are not comparable, since each value
+# defines a different reference millisecond.
+REFERENCE_NPS = 140000.
+
+SUITE_SEED = 0
+SUITE_SIZE = 16
+SEARCH_DEPTH = 7
+
+
+def position_suite(size=SUITE_SIZE, seed=SUITE_SEED):
+    """Return the move sequences leading to `size` positions from the early
+    and middle game, chosen at random from a fixed seed, so the suite is
+    the same on every machine.
+    """
+    rng = random.Random(seed)
+    suite = []
+    while len(suite) < size:
+        game = Board("Player1", "Player2", shuffle=False)
+        moves = []
+        for _ in range(4 + 4 * (len(suite) % 4)):
+            legal_moves = game.get_legal_moves()
+            if not legal_moves:
+                break
+            moves.append(rng.choice(legal_moves))
+            game.apply_move(moves[-1])
+        if game.get_legal_moves():
+            suite.append(moves)
+    return suite
+
+
+def reference_search(game, player, depth, alpha=float("-inf"), beta=float("inf")):
+    """Return (score, nodes) of a plain negamax alpha-beta search of `game`
+    to `depth` plies, scored with improved_score for `player`. Moves are
+    searched in the fixed order of `get_legal_moves()`, so the number of
+    nodes is the same on every machine.
+    """
+    legal_moves = game.get_legal_moves()
+    if depth == 0 or not legal_moves:
+        score = improved_score(game, player)
+        return (score if game.active_player is player else -score), 1
+    nodes = 1
+    best = float("-inf")
+    for move in legal_moves:
+        undo = game.apply_move(move)
+        score, child_nodes = reference_search(game, player, depth - 1, -beta, -max(alpha, best))
+        game.undo_move(undo)
+        nodes += child_nodes
+        best = max(best, -score)
+        if best >= beta:
+            break
+    return best, nodes
+
+
+def measure_nps(suite=None, depth=SEARCH_DEPTH, repeats=5):
+    """Return the nodes per second searched by `reference_search` to
+    `depth` from the positions of `suite` (by default `position_suite()`).
+    Each position is timed `repeats` times and its fastest run is used, so
+    an interruption by another process only spoils one sample.
+    """
+    if suite is None:
+        suite = position_suite()
+    nodes = 0
+    elapsed = 0.
+    for moves in suite:
+        game = Board("Player1", "Player2", shuffle=False)
+        for move in moves:
+            game.apply_move(move)
+        fastest = float("inf")
+        for _ in range(repeats):
+            start = timeit.default_timer()
+            position_nodes = reference_search(game, game.active_player, depth)[1]
+            fastest = min(fastest, timeit.default_timer() - start)
+        nodes += position_nodes
+        elapsed += fastest
+    return nodes / elapsed
+
+
+def calibrate(**kwargs):
+    """Return (factor, nodes per second) for this machine, where `factor`
+    is `REFERENCE_NPS` divided by the measured throughput; keyword
+    arguments are passed to `measure_nps`.
+    """
+    nps = measure_nps(**kwargs)
+    return REFERENCE_NPS / nps, nps
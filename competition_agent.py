@@ -7,6 +7,8 @@ champions) in a tournament.
 import random
 import numpy as np
 
+from game_agent import MoveOrderingMixin
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -37,22 +39,17 @@ def custom_score(game, player):
 
     aggressiveness = 1
 
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
     # Sum the available next moves for each legal move, assuming current board
-    own_next = float(sum([len(game._Board__get_moves(move)) for move in own_moves]))
-    opp_next = float(sum([len(game._Board__get_moves(move)) for move in opp_moves]))
+    own_next = float(sum([game.get_open_degree(move) for move in own_moves]))
+    opp_next = float(sum([game.get_open_degree(move) for move in opp_moves]))
     return (len(own_moves) * own_next) - aggressiveness * (len(opp_moves) * opp_next)
 
 
-class CustomPlayer:
+class CustomPlayer(MoveOrderingMixin):
     """Game-playing agent to use in the optional player vs player Isolation
     competition.
 
@@ -81,6 +78,7 @@ class CustomPlayer:
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.reset_move_ordering()
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -113,6 +111,7 @@ class CustomPlayer:
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        self.age_move_ordering()
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
@@ -191,6 +190,8 @@ class CustomPlayer:
         if not legal_moves:
             return (-1, -1)
 
+        self.prepare_move_ordering(game, depth)
+
         best_score = -np.inf
         best_move = legal_moves[0]
         for legal_move in legal_moves:
@@ -223,6 +224,7 @@ class CustomPlayer:
         if not legal_moves:
             return np.inf
 
+        self.order_by_history(legal_moves, current_depth)
         best_score = np.inf
         for m in legal_moves:
             if depth_limit == current_depth:
@@ -234,6 +236,7 @@ class CustomPlayer:
                 best_score = score
 
             if best_score <= alpha:
+                self.record_cutoff(current_depth, depth_limit, m)
                 return best_score
 
             beta = min(beta, best_score)
@@ -252,6 +255,7 @@ class CustomPlayer:
         if not legal_moves:
             return -np.inf
 
+        self.order_by_history(legal_moves, current_depth)
         best_score = -np.inf
         for m in legal_moves:
             if depth_limit == current_depth:
@@ -263,6 +267,7 @@ class CustomPlayer:
                 best_score = score
 
             if best_score >= beta:
+                self.record_cutoff(current_depth, depth_limit, m)
                 return best_score
 
             alpha = max(alpha, best_score)
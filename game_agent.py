@@ -2,8 +2,12 @@
 test your agent's strength against a set of known agents using tournament.py
 and include the results in your report.
 """
+from collections import OrderedDict
+
 import numpy as np
 
+from isolation.geometry import INTERIOR, CORNER
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -24,51 +28,7 @@ def percent_occupied(game):
             int
                 The percentage of occupied space in the board
         """
-    blank_spaces = game.get_blank_spaces()
-    return int((len(blank_spaces) / (game.width * game.height)) * 100)
-
-
-def is_near_walls(move, walls):
-    """
-    Checks if a move is on near the edges of the board
-
-    Parameters
-    ----------
-    move : (int, int)
-        The input move on the board
-
-    walls : list(list(tuples))
-        A nested list of tuples for each edge of the board
-
-    Returns
-    -------
-    bool
-        Returns True if a move lies along the edges else False
-    """
-    for wall in walls:
-        if move in wall:
-            return True
-    return False
-
-
-def is_in_corners(move, corners):
-    """
-        Checks if a move is in the corners of the board
-
-        Parameters
-        ----------
-        move : (int, int)
-            The input move on the board
-
-        corners : list(tuples)
-            A list of tuples for each corner of the board
-
-        Returns
-        -------
-        bool
-            Returns True if a move lies in a corner of the board else False
-    """
-    return move in corners
+    return int((game.blank_count() / (game.width * game.height)) * 100)
 
 
 def score_differential_open_move(game, player, aggressiveness=1.0):
@@ -96,17 +56,12 @@ def score_differential_open_move(game, player, aggressiveness=1.0):
         The heuristic value of the current game state to the specified player.
     """
 
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
     # print('aggressiveness: {}'.format(aggressiveness))
-    score = float(own_moves - aggressiveness * opp_moves)
+    score = float(len(own_moves) - aggressiveness * len(opp_moves))
 
     return score
 
@@ -133,14 +88,12 @@ def score_time_variant_differential_open_move(game, player, var=1):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_loser(player):
-        return float("-inf")
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = float(len(game.get_legal_moves(player)))
-    opp_moves = float(len(game.get_legal_moves(game.get_opponent(player))))
+    own_moves = float(len(own_moves))
+    opp_moves = float(len(opp_moves))
 
     pct = percent_occupied(game)
 
@@ -162,33 +115,24 @@ def score_time_variant_differential_open_move(game, player, var=1):
 
 def score_look_ahead_differential_move(game, player, aggressiveness=1.0):
     """ Improved score weighted on available moves of legal moves """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
     # Sum the available next moves for each legal move, assuming current board
-    own_next = float(sum([len(game._Board__get_moves(move)) for move in own_moves]))
-    opp_next = float(sum([len(game._Board__get_moves(move)) for move in opp_moves]))
+    own_next = float(sum([game.get_open_degree(move) for move in own_moves]))
+    opp_next = float(sum([game.get_open_degree(move) for move in opp_moves]))
     return (len(own_moves) * own_next) - aggressiveness * (len(opp_moves) * opp_next)
 
 
 def score_look_ahead_agg(game, player):
     """ Improved score weighted on available moves of legal moves """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
-
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    _, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
     # Sum the available next moves for each legal move, assuming current board
-    opp_next = float(sum([len(game._Board__get_moves(move)) for move in opp_moves]))
+    opp_next = float(sum([game.get_open_degree(move) for move in opp_moves]))
     return - (len(opp_moves) * opp_next)
 
 
@@ -215,23 +159,13 @@ def score_wall_corner_aware_differential_open_move(game, player):
         The heuristic value of the current game state to the specified player.
     """
 
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    own_moves, opp_moves, utility = game.get_mobility(player)
+    if utility:
+        return utility
 
-    walls = [
-        [(0, i) for i in range(game.width)],
-        [(i, 0) for i in range(game.height)],
-        [(game.width - 1, i) for i in range(game.width)],
-        [(i, game.height - 1) for i in range(game.height)]
-    ]
-
-    corners = [(0, 0), (0, game.width - 1), (game.height - 1, 0), (game.height - 1, game.width - 1)]
-
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    geometry = game.geometry
+    cell_class = geometry.cell_class
+    pct = percent_occupied(game)
 
     own_cum_score_wall = 0
     opp_cum_score_wall = 0
@@ -250,16 +184,17 @@ def score_wall_corner_aware_differential_open_move(game, player):
     move_left_score_inc = 10
 
     for move in own_moves:
-        if is_near_walls(move, walls):
-            if percent_occupied(game) < 30:
+        cell = cell_class[geometry.index(move)]
+        if cell != INTERIOR:  # the walls include the corners
+            if pct < 30:
                 own_cum_score_wall += wall_score_inc_early
-            elif 30 <= percent_occupied(game) < 60:
+            elif 30 <= pct < 60:
                 own_cum_score_wall += wall_score_inc_mid
             else:
                 own_cum_score_wall += wall_score_inc_late
 
-        elif is_in_corners(move, corners):
-            if percent_occupied(game) < 60:
+        elif cell == CORNER:
+            if pct < 60:
                 own_cum_score_corner += corner_score_inc_early
             else:
                 own_cum_score_corner += corner_score_inc_late
@@ -267,16 +202,17 @@ def score_wall_corner_aware_differential_open_move(game, player):
             own_moves_left += move_left_score_inc
 
     for move in opp_moves:
-        if is_near_walls(move, walls):
-            if percent_occupied(game) < 30:
+        cell = cell_class[geometry.index(move)]
+        if cell != INTERIOR:  # the walls include the corners
+            if pct < 30:
                 opp_cum_score_wall += wall_score_inc_early
-            elif 30 <= percent_occupied(game) < 60:
+            elif 30 <= pct < 60:
                 opp_cum_score_wall += wall_score_inc_mid
             else:
                 opp_cum_score_wall += wall_score_inc_late
 
-        elif is_in_corners(move, corners):
-            if percent_occupied(game) < 60:
+        elif cell == CORNER:
+            if pct < 60:
                 opp_cum_score_corner += corner_score_inc_early
             else:
                 opp_cum_score_corner += corner_score_inc_late
@@ -292,6 +228,85 @@ def score_wall_corner_aware_differential_open_move(game, player):
     return overall_score
 
 
+def batch_mobility(game, moves):
+    """Count the legal moves of both players in every position reached by
+    the active player making one of `moves`, using one stacked occupancy
+    array for all of the positions.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        The parent position.
+
+    moves : list<(int, int)>
+        Legal moves of the active player in `game`.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        For each move, the number of legal moves of the player that made it
+        and of the other player (who is to move next) in the child position.
+    """
+    geometry = game.geometry
+    matrix = geometry.knight_matrix
+    move_idx = np.array([geometry.index(move) for move in moves])
+    rows = np.arange(len(moves))
+
+    # Stack the children: the parent occupancy plus the cell each move blocks
+    blank = 1 - np.array(game.occupancy(), dtype=np.int8)
+    blank = np.repeat(blank[np.newaxis, :], len(moves), axis=0)
+    blank[rows, move_idx] = 0
+
+    mover_moves = (matrix[move_idx] * blank).sum(axis=1)
+    other_loc = game.get_player_location(game.inactive_player)
+    if other_loc is None:
+        other_moves = blank.sum(axis=1)
+    else:
+        other_moves = blank.dot(matrix[geometry.index(other_loc)])
+    return mover_moves, other_moves
+
+
+def batch_score_differential_open_move(game, moves, player, aggressiveness=1.0):
+    """Batch version of `score_differential_open_move`: return the heuristic
+    value, to `player`, of the position reached by the active player making
+    each of `moves`.
+
+    Note: this function should be used from within a Player instance as
+    `self.batch_score()` -- you should not need to call this function directly.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        The parent position of the positions to evaluate.
+
+    moves : list<(int, int)>
+        Legal moves of the active player in `game`.
+
+    player : object
+        A player instance in the current game.
+
+    Returns
+    -------
+    numpy.ndarray
+        The heuristic value of each child position, in the order of `moves`.
+    """
+    mover_moves, other_moves = batch_mobility(game, moves)
+    if player == game.active_player:
+        scores = mover_moves - aggressiveness * other_moves
+        scores[other_moves == 0] = np.inf
+    else:
+        scores = other_moves - aggressiveness * mover_moves
+        scores[other_moves == 0] = -np.inf
+    return scores.astype(float)
+
+
+def batch_improved_score(game, moves, player):
+    """Batch version of `sample_players.improved_score`; see
+    `batch_score_differential_open_move`.
+    """
+    return batch_score_differential_open_move(game, moves, player, aggressiveness=1.0)
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -372,6 +387,206 @@ def custom_score_3(game, player):
     return score_differential_open_move(game, player, aggressiveness=2.5)
 
 
+# Bound flags stored with transposition table scores
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Width of the zero window used by PVS probes; heuristic scores are far
+# coarser than this, so a probe only fails high on a genuinely better move
+NULL_WINDOW = 1e-6
+
+# Mixed into transposition table keys so that a player reused across games
+# never reads back scores computed while sitting in the other seat
+SEAT_KEYS = (0, 0x9E3779B97F4A7C15)
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results keyed by `Board.hash()`.
+
+    Each bucket has two slots: a depth-preferred slot that is only
+    overwritten by a search at least as deep (or by any search once its
+    entry is from an earlier `new_search()` generation), and an
+    always-replace slot that receives everything else. Entries are tuples
+    of (key, depth, score, flag, best_move, generation).
+
+    Parameters
+    ----------
+    size_mb : float (optional)
+        Approximate memory budget in megabytes; the number of buckets is
+        derived from `ENTRY_BYTES`.
+    """
+    # Approximate footprint of one stored entry (tuple, key, score, move and
+    # the list slot that references it) on 64-bit CPython
+    ENTRY_BYTES = 200
+
+    def __init__(self, size_mb=16):
+        self.num_buckets = max(1, int(size_mb * 2 ** 20) // (2 * self.ENTRY_BYTES))
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        """Remove every entry from the table. """
+        self._depth_preferred = [None] * self.num_buckets
+        self._always_replace = [None] * self.num_buckets
+
+    def new_search(self):
+        """Age the current entries so that they yield their depth-preferred
+        slots to results from the next search.
+        """
+        self.generation += 1
+
+    def lookup(self, key):
+        """Return the stored entry for `key`, or None if there is no entry. """
+        idx = key % self.num_buckets
+        entry = self._depth_preferred[idx]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self._always_replace[idx]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, best_move):
+        """Record the result of searching the position `key` to `depth`
+        remaining plies.
+        """
+        idx = key % self.num_buckets
+        entry = (key, depth, score, flag, best_move, self.generation)
+        current = self._depth_preferred[idx]
+        if current is None or depth >= current[1] or current[5] != self.generation:
+            self._depth_preferred[idx] = entry
+        else:
+            self._always_replace[idx] = entry
+
+
+class EvalCache:
+    """Memoize a heuristic `score_fn(game, player)` on the board hash and
+    the player, keeping at most `max_entries` scores and evicting the least
+    recently used one when full. An instance is itself a score function,
+    so it can wrap a `functools.partial` heuristic and be passed anywhere a
+    `score_fn` is expected.
+
+    The wrapped function must depend only on the position and the player
+    (as every heuristic in this module does), since that is all the key
+    records. Pickling a cache keeps the settings and counters but drops the
+    stored scores.
+
+    Each iterative-deepening pass of `AlphaBetaPlayer` moves the leaves one
+    ply deeper, so its leaves are rarely scored twice (under 1% hits in
+    timed games) and the cache costs more than it saves; check `hit_rate()`
+    before wrapping a heuristic for search.
+
+    Parameters
+    ----------
+    score_fn : callable
+        The heuristic to memoize.
+
+    max_entries : int (optional)
+        Maximum number of cached scores.
+    """
+
+    def __init__(self, score_fn, max_entries=2 ** 16):
+        self.score_fn = score_fn
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __call__(self, game, player):
+        key = (game.hash(), player)
+        entries = self._entries
+        score = entries.get(key)
+        if score is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return score
+        self.misses += 1
+        score = self.score_fn(game, player)
+        entries[key] = score
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return score
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        return state
+
+    def clear(self):
+        """Remove every cached score and reset the hit/miss counters. """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        """Return the fraction of calls answered from the cache. """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.
+
+
+class MoveOrderingMixin:
+    """Killer-move and history-heuristic ordering of interior moves, shared
+    by the iterative-deepening alpha-beta players. Classes using it must
+    call `reset_move_ordering()` from their constructor and
+    `prepare_move_ordering()` at the start of every search pass.
+    """
+
+    def reset_move_ordering(self):
+        """Forget all move ordering information. """
+        # Two killer moves per ply, and a history score per destination cell
+        # for each side (indexed by current_depth % 2, so 1 holds this
+        # player's moves)
+        self.killers = []
+        self.history = [[], []]
+        self._height = 0
+
+    def prepare_move_ordering(self, game, depth):
+        """Size the killer and history tables for a search of `game` to
+        `depth` plies.
+        """
+        if len(self.history[0]) != game.width * game.height:
+            self.history = [[0] * (game.width * game.height) for _ in range(2)]
+        self._height = game.height
+        while len(self.killers) <= depth:
+            self.killers.append([None, None])
+
+    def order_by_history(self, legal_moves, current_depth):
+        """Reorder `legal_moves` in place for the interior node at
+        `current_depth`: killer moves for the ply first, then the remaining
+        moves by history score.
+        """
+        history = self.history[current_depth % 2]
+        height = self._height
+        legal_moves.sort(key=lambda m: history[m[0] + m[1] * height], reverse=True)
+        for killer in reversed(self.killers[current_depth]):
+            if killer in legal_moves:
+                legal_moves.remove(killer)
+                legal_moves.insert(0, killer)
+
+    def record_cutoff(self, current_depth, depth_limit, move):
+        """Credit `move` for causing a cutoff at the node at `current_depth`
+        by making it the first killer move for the ply and bumping its
+        history score by the square of the remaining depth.
+        """
+        killers = self.killers[current_depth]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        draft = depth_limit - current_depth + 1
+        self.history[current_depth % 2][move[0] + move[1] * self._height] += draft * draft
+
+    def age_move_ordering(self):
+        """Forget the killer moves and halve the history scores, so that
+        ordering information from earlier moves fades out over the game.
+        """
+        self.killers = []
+        for history in self.history:
+            for idx in range(len(history)):
+                history[idx] //= 2
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -502,14 +717,19 @@ class MinimaxPlayer(IsolationPlayer):
         if not legal_moves:
             return (-1, -1)
 
+        # Search on a private copy with apply_move/undo_move so that a timeout
+        # in the middle of the tree cannot leave the caller's board modified
+        game = game.copy()
+
         best_score = -np.inf
         best_move = legal_moves[0]
         for legal_move in legal_moves:
+            undo = game.apply_move(legal_move)
             if depth == current_depth:
-                score = self.score(game.forecast_move(legal_move), self)
+                score = self.score(game, self)
             else:
-                score = self.min_value(game.forecast_move(legal_move),
-                                       current_depth=current_depth + 1, depth_limit=depth)
+                score = self.min_value(game, current_depth=current_depth + 1, depth_limit=depth)
+            game.undo_move(undo)
             # print('inner loop: ', min_val, legal_move)
             if score > best_score:
                 best_score = score
@@ -529,10 +749,12 @@ class MinimaxPlayer(IsolationPlayer):
 
         best_score = np.inf
         for m in legal_moves:
+            undo = game.apply_move(m)
             if depth_limit == current_depth:
-                score = self.score(game.forecast_move(m), self)
+                score = self.score(game, self)
             else:
-                score = self.max_value(game.forecast_move(m), current_depth + 1, depth_limit)
+                score = self.max_value(game, current_depth + 1, depth_limit)
+            game.undo_move(undo)
 
             if score < best_score:
                 best_score = score
@@ -550,10 +772,12 @@ class MinimaxPlayer(IsolationPlayer):
 
         best_score = -np.inf
         for m in legal_moves:
+            undo = game.apply_move(m)
             if depth_limit == current_depth:
-                score = self.score(game.forecast_move(m), self)
+                score = self.score(game, self)
             else:
-                score = self.min_value(game.forecast_move(m), current_depth + 1, depth_limit)
+                score = self.min_value(game, current_depth + 1, depth_limit)
+            game.undo_move(undo)
 
             if score > best_score:
                 best_score = score
@@ -561,11 +785,99 @@ class MinimaxPlayer(IsolationPlayer):
         return best_score
 
 
-class AlphaBetaPlayer(IsolationPlayer):
+class AlphaBetaPlayer(MoveOrderingMixin, IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    tt_size_mb : float or None (optional)
+        Memory budget in megabytes of the transposition table that carries
+        search results across iterative-deepening passes and moves; None
+        (the default) disables the table. Transpositions are rare in
+        Isolation, so at fixed depth the table produces almost no cutoffs
+        and its probe/store cost and move ordering make plain alpha-beta
+        slower; it is needed by `MTDfPlayer`.
+
+    pvs : bool (optional)
+        If True, use Principal Variation Search (NegaScout): every move after
+        the first is searched with a null window, and only re-searched with
+        the full window when it fails high.
+
+    aspiration_window : float or None (optional)
+        Half-width of the aspiration window centered on the previous
+        iterative-deepening score that each new depth is first searched
+        with; None searches every depth with the full (-inf, inf) window.
+
+    aspiration_growth : float (optional)
+        Factor by which the aspiration window half-width grows each time
+        the search fails high or low and has to be repeated.
+
+    batch_score_fn : callable (optional)
+        A function `batch_score_fn(game, moves, player)` returning the
+        heuristic values, to `player`, of the positions reached by each of
+        `moves` (see `batch_score_differential_open_move`). When given, the
+        children of nodes one ply above the search horizon are scored with
+        a single call instead of one `score_fn` call per child; it must
+        agree with `score_fn`, which is still used at the root.
+
+    amortized_timer : bool (optional)
+        If True, read the clock through `time_left()` only every N nodes,
+        with N recomputed at each read from the measured node rate so that
+        the next read falls within `TIMER_CHECK_MS` and within half of the
+        remaining slack before `TIMER_THRESHOLD`. If False, poll the clock
+        at every node with a 50% safety margin on the threshold.
+
+    node_budget : int or None (optional)
+        If given, each move stops searching after this many nodes and plays
+        the best move of the last completed iterative-deepening pass, and
+        the clock is never read. Unlike a time limit, the result does not
+        depend on the speed or load of the machine.
+
+    depth_limit : int or None (optional)
+        If given, iterative deepening stops after completing this depth
+        (or earlier, when `node_budget` runs out), and the clock is never
+        read.
+
+    See `IsolationPlayer` for the remaining parameters.
     """
+    # Longest time in milliseconds to search between two clock reads
+    TIMER_CHECK_MS = 2.
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10., tt_size_mb=None, pvs=False,
+                 aspiration_window=None, aspiration_growth=4., amortized_timer=True, batch_score_fn=None,
+                 node_budget=None, depth_limit=None):
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout)
+        self.batch_score = batch_score_fn
+        self.amortized_timer = amortized_timer
+        self.node_budget = node_budget
+        self.depth_limit = depth_limit
+        self._check_countdown = 1
+        self._last_time_left = 0.
+        self._last_check_nodes = 0
+        self.pvs = pvs
+        self.aspiration_window = aspiration_window
+        self.aspiration_growth = aspiration_growth
+        self.root_score = None
+
+        # Search statistics: nodes searched and depth completed on the last
+        # move, and running totals over every move since construction
+        self.nodes = 0
+        self.depth_reached = 0
+        self.total_moves = 0
+        self.total_nodes = 0
+        self.total_depth = 0
+        self.transposition_table = TranspositionTable(tt_size_mb) if tt_size_mb is not None else None
+        self._tt_seat = 0
+
+        # Results of the last completed iterative-deepening pass, used to
+        # order the moves of the next pass
+        self.principal_variation = []
+        self.root_scores = {}
+        self._on_pv = False
+        self._pv_table = []
+        self.reset_move_ordering()
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -598,29 +910,97 @@ class AlphaBetaPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        self.principal_variation = []
+        self.root_scores = {}
+        self.root_score = None
+        self.nodes = 0
+        self.depth_reached = 0
+        self._check_countdown = 1
+        self._last_time_left = time_left() if self.wall_clock else 0.
+        self._last_check_nodes = 0
+        self.age_move_ordering()
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_moves = [(-2, -2)]
 
         max_depth = 1
+        max_plies = len(game.get_blank_spaces())
 
         while True:
             try:
                 # The try/except block will automatically catch the exception
                 # raised when the timer is about to expire.
-                best_moves.append(self.alphabeta(game, max_depth))
+                best_moves.append(self.search_iteration(game, max_depth))
                 # print('****', best_move)
 
             except SearchTimeout:
-                return best_moves[-1]
+                break
                 # pass  # Handle any actions required after timeout as needed
 
+            self.depth_reached = max_depth
+
+            # Deeper passes cannot change a proven win or loss, and cannot
+            # look further ahead than the number of blank cells left
+            if self.root_score in (None, np.inf, -np.inf) or max_depth >= max_plies:
+                break
+            if self.depth_limit is not None and max_depth >= self.depth_limit:
+                break
+
             max_depth += 1
             # print(current_depth)
 
-            # Return the best move from the last completed search iteration
-            # return best_move
+        self.total_moves += 1
+        self.total_nodes += self.nodes
+        self.total_depth += self.depth_reached
+
+        # Return the best move from the last completed search iteration
+        return best_moves[-1]
+
+    @property
+    def wall_clock(self):
+        """Whether the search is limited by `time_left()` rather than by a
+        node budget or depth limit.
+        """
+        return self.node_budget is None and self.depth_limit is None
+
+    def search_iteration(self, game, depth):
+        """Run one iterative-deepening pass to `depth` and return its best
+        move, using an aspiration window when one is configured.
+        """
+        if self.aspiration_window is None or depth == 1:
+            return self.alphabeta(game, depth)
+        return self.aspiration_search(game, depth)
+
+    def aspiration_search(self, game, depth):
+        """Search to `depth` with a narrow window around the score of the
+        previous iteration, widening it on the failing side by
+        `aspiration_growth` until the score falls inside the window.
+
+        Returns
+        -------
+        (int, int)
+            The best move found by the first search that did not fail.
+        """
+        guess = self.root_score
+        if guess is None or guess in (np.inf, -np.inf):
+            return self.alphabeta(game, depth)
+
+        delta = self.aspiration_window
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            move = self.alphabeta(game, depth, alpha, beta)
+            score = self.root_score
+            if score <= alpha and alpha > -np.inf:
+                delta *= self.aspiration_growth
+                alpha = score - delta
+            elif score >= beta and beta < np.inf:
+                delta *= self.aspiration_growth
+                beta = score + delta
+            else:
+                return move
 
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
@@ -667,89 +1047,309 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
+        if self.wall_clock and self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
         current_depth = 1
 
+        # Search on a private copy with apply_move/undo_move so that a timeout
+        # in the middle of the tree cannot leave the caller's board modified.
+        # Moves are ordered by the search itself, so skip shuffling; the root
+        # moves come from the copy too, so that ties between them are not
+        # broken by the caller's random number generator
+        game = game.copy()
+        game.shuffle = False
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return (-1, -1)
 
+        self._tt_seat = SEAT_KEYS[game.move_count % 2]
+
+        self.prepare_move_ordering(game, depth)
+
+        # Best first according to the previous pass: its principal variation
+        # leads, followed by the remaining root moves in order of score
+        legal_moves.sort(key=lambda m: self.root_scores.get(m, -np.inf), reverse=True)
+        self._pv_table = [[] for _ in range(depth + 1)]
+        self._on_pv = bool(self.principal_variation)
+        self.order_moves(legal_moves, current_depth, None)
+
+        root_scores = {}
         best_score = -np.inf
         best_move = legal_moves[0]
-        for legal_move in legal_moves:
-            if depth == current_depth:
-                score = self.score(game.forecast_move(legal_move), self)
-            else:
-                score = self.min_value(game.forecast_move(legal_move),
-                                       current_depth=current_depth + 1, depth_limit=depth, alpha=alpha, beta=beta)
+        for i, legal_move in enumerate(legal_moves):
+            if i > 0:
+                self._on_pv = False
+            undo = game.apply_move(legal_move)
+            score = self.search_child(game, current_depth, depth, alpha, beta, i == 0)
+            game.undo_move(undo)
+            root_scores[legal_move] = score
             # print('inner loop: ', min_val, legal_move)
             if score > best_score:
                 best_score = score
                 best_move = legal_move
+                self.update_pv(current_depth, depth, legal_move)
 
             if best_score >= beta:
-                return best_move
+                break
 
             alpha = max(alpha, best_score)
 
+        self.principal_variation = self._pv_table[0]
+        self.root_scores = root_scores
+        self.root_score = best_score
+
         # print('>>>>>', minimax_move, self.time_left())
         return best_move
 
-    def min_value(self, game, current_depth, depth_limit, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD * 1.5:
-            # print('raising timeout in min_value')
-            # print('current depth', current_depth)
-            # print('depth limit', depth_limit)
+    def order_moves(self, legal_moves, current_depth, tt_move):
+        """Reorder `legal_moves` in place for the node at `current_depth`:
+        the previous pass's principal variation move comes first while the
+        search is still following that line, then the transposition table
+        move, the killer moves for the ply, and the remaining moves by
+        history score. The root is ordered by `alphabeta` itself.
+        """
+        if current_depth > 1:
+            self.order_by_history(legal_moves, current_depth)
+
+        if tt_move in legal_moves:
+            legal_moves.remove(tt_move)
+            legal_moves.insert(0, tt_move)
+
+        if self._on_pv:
+            ply = current_depth - 1
+            pv_move = self.principal_variation[ply] if ply < len(self.principal_variation) else None
+            if pv_move in legal_moves:
+                legal_moves.remove(pv_move)
+                legal_moves.insert(0, pv_move)
+            else:
+                self._on_pv = False
+
+    def update_pv(self, current_depth, depth_limit, move):
+        """Record `move` followed by the child's best line as the principal
+        variation of the node at `current_depth`.
+        """
+        ply = current_depth - 1
+        if current_depth < depth_limit:
+            self._pv_table[ply] = [move] + self._pv_table[ply + 1]
+        else:
+            self._pv_table[ply] = [move]
+
+    def check_time(self):
+        """Read the clock, raise `SearchTimeout` once less than
+        `TIMER_THRESHOLD` milliseconds are left, and otherwise schedule the
+        next read from the node rate measured since the previous one.
+        """
+        remaining = self.time_left()
+        slack = remaining - self.TIMER_THRESHOLD
+        if slack < 0:
             raise SearchTimeout()
 
-        legal_moves = game.get_legal_moves()
-        if not legal_moves:
-            return np.inf
+        elapsed = self._last_time_left - remaining
+        nodes = self.nodes - self._last_check_nodes
+        self._last_time_left = remaining
+        self._last_check_nodes = self.nodes
+        if elapsed > 0 and nodes > 0:
+            budget = min(slack / 2., self.TIMER_CHECK_MS)
+            self._check_countdown = max(1, int(nodes * budget / elapsed))
+        else:
+            # the clock has not advanced measurably, so widen the interval
+            self._check_countdown = max(1, 2 * nodes)
 
-        best_score = np.inf
-        for m in legal_moves:
-            if depth_limit == current_depth:
-                score = self.score(game.forecast_move(m), self)
-            else:
-                score = self.max_value(game.forecast_move(m), current_depth + 1, depth_limit, alpha, beta)
+    def tt_key(self, game):
+        """Return the transposition table key of a position. Scores are
+        stored from this player's point of view, so the key also records
+        which seat the player occupies in the current game.
+        """
+        return game.hash() ^ self._tt_seat
 
-            if score < best_score:
-                best_score = score
+    def probe(self, game, draft, alpha, beta):
+        """Look up a position in the transposition table.
 
-            if best_score <= alpha:
-                return best_score
+        Returns
+        -------
+        (float or None, float, float, (int, int) or None)
+            The stored score if it settles the node within the (alpha, beta)
+            window (otherwise None), the window narrowed by any stored bound,
+            and the stored best move for move ordering.
+        """
+        entry = self.transposition_table.lookup(self.tt_key(game))
+        if entry is None:
+            return None, alpha, beta, None
+
+        _, depth, score, flag, best_move, _ = entry
+        if depth >= draft:
+            if flag == EXACT:
+                return score, alpha, beta, best_move
+            elif flag == LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score, alpha, beta, best_move
+        return None, alpha, beta, best_move
+
+    def search_child(self, game, current_depth, depth_limit, alpha, beta, first):
+        """Return the negamax value, from the point of view of the player to
+        move at `current_depth`, of the child position that has just been
+        applied to `game`. In PVS mode every child but the first is probed
+        with a null window and only re-searched if it fails high.
+        """
+        if depth_limit == current_depth:
+            score = self.score(game, self)
+            return score if current_depth % 2 else -score
 
-            beta = min(beta, best_score)
+        if first or not self.pvs:
+            return -self.negamax(game, current_depth + 1, depth_limit, -beta, -alpha)
 
-        # print('min_val depth: {}, min_score {}'.format(current_depth, min_score))
-        return best_score
+        score = -self.negamax(game, current_depth + 1, depth_limit, -alpha - NULL_WINDOW, -alpha)
+        if alpha < score < beta:
+            score = -self.negamax(game, current_depth + 1, depth_limit, -beta, -alpha)
+        return score
 
-    def max_value(self, game, current_depth, depth_limit, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD * 1.5:
-            # print('raising timeout in max_value')
-            # print('current depth', current_depth)
-            # print('depth limit', depth_limit)
+    def score_frontier(self, game, legal_moves, current_depth):
+        """Score every child of a node one ply above the search horizon with
+        a single `batch_score` call.
+
+        Returns
+        -------
+        (float, (int, int))
+            The negamax value of the node and the move that achieves it.
+        """
+        scores = self.batch_score(game, legal_moves, self)
+        if current_depth % 2 == 0:
+            scores = -scores
+        best = int(np.argmax(scores))
+        return float(scores[best]), legal_moves[best]
+
+    def negamax(self, game, current_depth, depth_limit, alpha, beta):
+        """Return the alpha-beta value of the position at `current_depth`
+        from the point of view of its player to move; `self` moves at odd
+        depths (the root is depth 1) and the opponent at even depths.
+        """
+        if not self.wall_clock:
+            if self.node_budget is not None and self.nodes >= self.node_budget:
+                raise SearchTimeout()
+        elif self.amortized_timer:
+            self._check_countdown -= 1
+            if self._check_countdown <= 0:
+                self.check_time()
+        elif self.time_left() < self.TIMER_THRESHOLD * 1.5:
             raise SearchTimeout()
 
+        self.nodes += 1
+        self._pv_table[current_depth - 1] = []
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return -np.inf
 
-        best_score = -np.inf
-        for m in legal_moves:
-            if depth_limit == current_depth:
-                score = self.score(game.forecast_move(m), self)
+        draft = depth_limit - current_depth + 1
+        tt_move = None
+        if self.transposition_table is not None:
+            tt_score, alpha, beta, tt_move = self.probe(game, draft, alpha, beta)
+            if tt_score is not None:
+                self._on_pv = False
+                return tt_score
+        # The bound flag is decided against the window actually searched,
+        # after any narrowing by the stored entry
+        alpha_orig = alpha
+
+        if self.batch_score is not None and depth_limit == current_depth:
+            best_score, best_move = self.score_frontier(game, legal_moves, current_depth)
+            self.update_pv(current_depth, depth_limit, best_move)
+            if best_score >= beta:
+                self.record_cutoff(current_depth, depth_limit, best_move)
+        else:
+            self.order_moves(legal_moves, current_depth, tt_move)
+
+            best_score = -np.inf
+            best_move = legal_moves[0]
+            for i, m in enumerate(legal_moves):
+                if i > 0:
+                    self._on_pv = False
+                undo = game.apply_move(m)
+                score = self.search_child(game, current_depth, depth_limit, alpha, beta, i == 0)
+                game.undo_move(undo)
+
+                if score > best_score:
+                    best_score = score
+                    best_move = m
+                    self.update_pv(current_depth, depth_limit, m)
+
+                if best_score >= beta:
+                    self.record_cutoff(current_depth, depth_limit, m)
+                    break
+
+                alpha = max(alpha, best_score)
+
+        if self.transposition_table is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER_BOUND
+            elif best_score >= beta:
+                flag = LOWER_BOUND
             else:
-                score = self.min_value(game.forecast_move(m), current_depth + 1, depth_limit, alpha, beta)
+                flag = EXACT
+            self.transposition_table.store(self.tt_key(game), draft, best_score, flag, best_move)
 
-            if score > best_score:
-                best_score = score
+        return best_score
 
-            if best_score >= beta:
-                return best_score
 
-            alpha = max(alpha, best_score)
+class MTDfPlayer(AlphaBetaPlayer):
+    """Game-playing agent that chooses a move using iterative deepening with
+    MTD(f): each depth converges on the minimax value through a sequence of
+    zero-window alpha-beta searches, starting from the previous depth's
+    value and relying on the transposition table to avoid re-searching the
+    positions visited by earlier passes.
+
+    Parameters
+    ----------
+    tt_size_mb : float (optional)
+        Memory budget in megabytes of the transposition table, which MTD(f)
+        cannot run without.
+
+    See `AlphaBetaPlayer` for the remaining parameters.
+    """
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10., tt_size_mb=16,
+                 node_budget=None, depth_limit=None):
+        if tt_size_mb is None:
+            raise ValueError("MTDfPlayer requires a transposition table.")
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout,
+                         tt_size_mb=tt_size_mb, node_budget=node_budget, depth_limit=depth_limit)
+
+    def search_iteration(self, game, depth):
+        first_guess = self.root_score
+        if first_guess is None or first_guess in (np.inf, -np.inf):
+            first_guess = 0.
+        return self.mtdf(game, depth, first_guess)
+
+    def mtdf(self, game, depth, first_guess):
+        """Find the minimax value of the root to `depth` with zero-window
+        searches that move a lower and an upper bound towards each other.
+
+        Returns
+        -------
+        (int, int)
+            The best move of the last search that failed high (proving the
+            final lower bound), or of the last search if none did; (-1, -1)
+            if there are no legal moves.
+        """
+        value = first_guess
+        lower, upper = -np.inf, np.inf
+        best_move = None
+        while lower < upper:
+            beta = max(value, lower + NULL_WINDOW)
+            move = self.alphabeta(game, depth, beta - NULL_WINDOW, beta)
+            if move == (-1, -1):
+                return move
+
+            value = self.root_score
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+                best_move = move
+
+        self.root_score = value
+        return best_move if best_move is not None else move
 
-        return best_score
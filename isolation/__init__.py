@@ -9,3 +9,5 @@ legal moves loses, and the opponent is declared the winner.
 
 # Make the Board class available at the root of the module for imports
 from .isolation import Board
+from .geometry import BoardGeometry, get_geometry, INTERIOR, EDGE, CORNER
+from .batch import BoardBatch
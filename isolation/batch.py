@@ -0,0 +1,160 @@
+"""
+A structure-of-arrays container that advances many games of Isolation at
+once with vectorized NumPy operations, for Monte Carlo playouts and
+self-play data generation.
+
+Cells use the flat index of `Board` (`idx = row + col * height`), and a
+player that has not moved yet has location -1.
+"""
+import numpy as np
+
+from .geometry import get_geometry
+
+NOT_MOVED = -1
+
+
+class BoardBatch(object):
+    """A batch of independent Isolation games stored as NumPy arrays.
+
+    Parameters
+    ----------
+    num_games : int
+        The number of games in the batch; all of them start empty.
+
+    width : int (optional)
+        The number of columns of every board.
+
+    height : int (optional)
+        The number of rows of every board.
+
+    Attributes
+    ----------
+    occupied : numpy.ndarray
+        (num_games, cells) boolean array of blocked cells.
+
+    locations : numpy.ndarray
+        (num_games, 2) integer array with the flat cell index of player 1
+        (column 0) and player 2 (column 1), or -1 if they have not moved.
+
+    to_move : numpy.ndarray
+        (num_games,) integer array holding 0 where player 1 has the
+        initiative and 1 where player 2 has it.
+
+    move_count : numpy.ndarray
+        (num_games,) integer array with the number of moves applied.
+    """
+
+    def __init__(self, num_games, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.num_games = num_games
+        self.occupied = np.zeros((num_games, width * height), dtype=bool)
+        self.locations = np.full((num_games, 2), NOT_MOVED, dtype=np.int64)
+        self.to_move = np.zeros(num_games, dtype=np.int64)
+        self.move_count = np.zeros(num_games, dtype=np.int64)
+        self._knights = get_geometry(width, height).knight_matrix
+        self._rows = np.arange(num_games)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """Build a batch holding the current state of each `Board` in
+        `boards`, which must all have the same size.
+        """
+        width, height = boards[0].width, boards[0].height
+        batch = cls(len(boards), width, height)
+        geometry = get_geometry(width, height)
+        for i, board in enumerate(boards):
+            if (board.width, board.height) != (width, height):
+                raise ValueError("All boards in a batch must have the same size.")
+            batch.occupied[i] = board.occupancy()
+            batch.to_move[i] = board.move_count % 2
+            batch.move_count[i] = board.move_count
+            for player, seat in [(board.active_player, batch.to_move[i]),
+                                 (board.inactive_player, 1 - batch.to_move[i])]:
+                loc = board.get_player_location(player)
+                if loc is not None:
+                    batch.locations[i, seat] = geometry.index(loc)
+        return batch
+
+    def legal_move_mask(self):
+        """Return a (num_games, cells) boolean array marking the legal moves
+        of the player to move in each game.
+        """
+        loc = self.locations[self._rows, self.to_move]
+        reachable = self._knights[np.maximum(loc, 0)]
+        reachable[loc == NOT_MOVED] = True
+        return reachable & ~self.occupied
+
+    def terminal(self):
+        """Return a boolean array marking the games whose player to move has
+        no legal moves, i.e., the games that are over.
+        """
+        return ~self.legal_move_mask().any(axis=1)
+
+    def winners(self):
+        """Return an integer array with the seat (0 for player 1, 1 for
+        player 2) of the winner of each finished game, and -1 for games
+        still in progress.
+        """
+        return np.where(self.terminal(), 1 - self.to_move, -1)
+
+    def apply_moves(self, moves):
+        """Move the player to move in every game, in place.
+
+        Parameters
+        ----------
+        moves : numpy.ndarray
+            (num_games,) integer array of flat cell indices; games with a
+            negative entry are left unchanged. Moves are not checked for
+            legality -- use `legal_move_mask()` to choose them.
+        """
+        moves = np.asarray(moves)
+        active = moves >= 0
+        rows = self._rows[active]
+        self.occupied[rows, moves[active]] = True
+        self.locations[rows, self.to_move[active]] = moves[active]
+        self.to_move[active] ^= 1
+        self.move_count[active] += 1
+
+    def random_moves(self, rng=np.random):
+        """Return a uniformly random legal move for the player to move in
+        each game, or -1 where the game is over.
+        """
+        mask = self.legal_move_mask()
+        keys = rng.random_sample(mask.shape) * mask
+        return np.where(mask.any(axis=1), keys.argmax(axis=1), -1)
+
+    def greedy_moves(self, rng=np.random):
+        """Return, for each game, the legal move that leaves the player to
+        move with the most legal moves on its next turn (ties broken at
+        random), or -1 where the game is over.
+        """
+        mask = self.legal_move_mask()
+        blank = (~self.occupied).astype(np.int64)
+        mobility = blank.dot(self._knights.astype(np.int64))
+        keys = (mobility + rng.random_sample(mask.shape)) * mask
+        return np.where(mask.any(axis=1), keys.argmax(axis=1), -1)
+
+    def playout(self, policy="random", rng=np.random):
+        """Play every game in the batch to the end, advancing all games in
+        progress by one move per step.
+
+        Parameters
+        ----------
+        policy : str (optional)
+            "random" or "greedy"; see `random_moves()` and `greedy_moves()`.
+
+        rng : numpy.random.RandomState (optional)
+            The random number generator used to choose moves.
+
+        Returns
+        -------
+        numpy.ndarray
+            The seat of the winner of each game (see `winners()`).
+        """
+        choose = {"random": self.random_moves, "greedy": self.greedy_moves}[policy]
+        while True:
+            moves = choose(rng)
+            if (moves < 0).all():
+                return self.winners()
+            self.apply_moves(moves)
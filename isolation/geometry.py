@@ -0,0 +1,131 @@
+"""
+Precomputed lookup tables that depend only on the board dimensions.
+
+Cells are addressed by the same flat index used by `Board._board_state`,
+i.e., `idx = row + col * height`, and the bitboard representation of a set
+of cells is the integer with bit `idx` set for every cell in the set.
+"""
+import random
+from functools import lru_cache
+
+import numpy as np
+
+KNIGHT_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                     (1, -2), (1, 2), (2, -1), (2, 1)]
+
+# Cell classes stored in `BoardGeometry.cell_class`
+INTERIOR, EDGE, CORNER = 0, 1, 2
+
+
+class BoardGeometry(object):
+    """Lookup tables for a board of the given size. Instances are shared
+    between every board with the same dimensions, so they must be treated as
+    read-only; use `get_geometry()` rather than constructing them directly.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns on the board.
+
+    height : int
+        The number of rows on the board.
+
+    Attributes
+    ----------
+    coords : list<(int, int)>
+        The (row, column) coordinate pair of each flat cell index.
+
+    full_mask : int
+        Bitboard with every cell on the board set.
+
+    knight_masks : list<int>
+        Bitboard of the cells a knight can reach from each flat cell index.
+
+    knight_neighbors : list<tuple<int>>
+        Flat indices of the cells a knight can reach from each flat cell
+        index; the same cells as `knight_masks`.
+
+    knight_matrix : numpy.ndarray
+        Read-only (cells, cells) boolean adjacency matrix whose row `idx`
+        marks the cells a knight can reach from flat cell index `idx`; the
+        same cells as `knight_neighbors`, for vectorized code.
+
+    cell_class : list<int>
+        Class of each flat cell index: `CORNER`, `EDGE` (a non-corner cell
+        on the border), or `INTERIOR`.
+
+    ring : list<int>
+        Concentric ring of each flat cell index, counted inwards from the
+        border (0) towards the center of the board.
+
+    zobrist_cells, zobrist_p1, zobrist_p2 : list<int>
+        Random 64-bit Zobrist keys for a blocked cell and for the location of
+        each player at every flat cell index.
+
+    zobrist_p2_to_move : int
+        Random 64-bit Zobrist key toggled whenever the initiative changes.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.full_mask = (1 << self.size) - 1
+        self.coords = [(idx % height, idx // height) for idx in range(self.size)]
+
+        self.knight_masks = []
+        self.knight_neighbors = []
+        for r, c in self.coords:
+            neighbors = tuple(r + dr + (c + dc) * height for dr, dc in KNIGHT_DIRECTIONS
+                              if 0 <= r + dr < height and 0 <= c + dc < width)
+            self.knight_neighbors.append(neighbors)
+            self.knight_masks.append(sum(1 << idx for idx in neighbors))
+
+        self.knight_matrix = np.zeros((self.size, self.size), dtype=bool)
+        for idx, neighbors in enumerate(self.knight_neighbors):
+            self.knight_matrix[idx, list(neighbors)] = True
+        self.knight_matrix.flags.writeable = False
+
+        self.cell_class = []
+        self.ring = []
+        for r, c in self.coords:
+            on_row_edge = r in (0, height - 1)
+            on_col_edge = c in (0, width - 1)
+            if on_row_edge and on_col_edge:
+                self.cell_class.append(CORNER)
+            elif on_row_edge or on_col_edge:
+                self.cell_class.append(EDGE)
+            else:
+                self.cell_class.append(INTERIOR)
+            self.ring.append(min(r, c, height - 1 - r, width - 1 - c))
+
+        # Seed from the dimensions so keys are identical in every process
+        rng = random.Random("zobrist-{}x{}".format(width, height))
+        self.zobrist_cells = [rng.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_p1 = [rng.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_p2 = [rng.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_p2_to_move = rng.getrandbits(64)
+
+    def index(self, move):
+        """Return the flat cell index of a (row, column) coordinate pair. """
+        return move[0] + move[1] * self.height
+
+    def to_moves(self, bits):
+        """Return the list of (row, column) coordinate pairs for every cell
+        set in a bitboard, in increasing order of flat cell index.
+        """
+        coords = self.coords
+        moves = []
+        while bits:
+            low = bits & -bits
+            moves.append(coords[low.bit_length() - 1])
+            bits ^= low
+        return moves
+
+
+@lru_cache(maxsize=None)
+def get_geometry(width, height):
+    """Return the shared `BoardGeometry` for a board of the given size. The
+    tables are built on the first request for each (width, height).
+    """
+    return BoardGeometry(width, height)
@@ -11,6 +11,8 @@ import random
 import timeit
 from copy import copy
 
+from .geometry import get_geometry
+
 TIME_LIMIT_MILLIS = 150
 
 
@@ -33,13 +35,32 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    bitboard : bool (optional)
+        If True (the default), legal moves are generated from an integer
+        occupancy bitmask and the precomputed knight-move masks for the board
+        size; otherwise they are generated by testing each candidate move
+        against `_board_state` with `move_is_legal()`.
+
+    shuffle : bool (optional)
+        If True (the default), `get_legal_moves()` returns the moves in
+        random order; otherwise in a fixed order, which is cheaper and keeps
+        searches that do their own move ordering reproducible.
+
+    seed : hashable (optional)
+        Seed of a random number generator private to this board (and shared
+        with its copies) that is used for shuffling moves. If None, moves
+        are shuffled with the global `random` module.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    def __init__(self, player_1, player_2, width=7, height=7, bitboard=True, shuffle=True, seed=None):
         self.width = width
         self.height = height
+        self.bitboard = bitboard
+        self.shuffle = shuffle
+        self._random = random.Random(seed) if seed is not None else None
         self.move_count = 0
         self._player_1 = player_1
         self._player_2 = player_2
@@ -52,8 +73,47 @@ class Board(object):
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
 
+        # Bit `idx` of the occupancy mask is set when cell `idx` is blocked
+        self._geometry = get_geometry(width, height)
+        self._occupied = 0
+
+        # 64-bit Zobrist key of the position, updated incrementally by
+        # apply_move() and undo_move()
+        self._zobrist = 0
+
+        # Number of blank cells a knight can reach from each cell, updated
+        # incrementally by apply_move() and undo_move()
+        self._open_degree = [len(neighbors) for neighbors in self._geometry.knight_neighbors]
+        self._blank_count = width * height
+
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the 64-bit Zobrist key of the current game state, which
+        covers the blocked cells, both player locations, and the initiative.
+        """
+        return self._zobrist
+
+    def __hash__(self):
+        return self._zobrist
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self._zobrist == other._zobrist and self.width == other.width and
+                self.height == other.height and self._board_state == other._board_state)
+
+    @property
+    def random(self):
+        """The random number generator used for shuffling moves: the
+        board's own (shared with its copies) if it was seeded, otherwise the
+        global one behind the `random` module. Only the seeded generator is
+        stored, so unseeded boards can be pickled and deep-copied.
+        """
+        return self._random if self._random is not None else random._inst
+
+    @property
+    def geometry(self):
+        """The shared `BoardGeometry` lookup tables for the board size. """
+        return self._geometry
 
     @property
     def active_player(self):
@@ -92,11 +152,12 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
-        new_board.move_count = self.move_count
-        new_board._active_player = self._active_player
-        new_board._inactive_player = self._inactive_player
+        # Skip __init__, whose fresh board state would be thrown away; the
+        # mutable lists are the only attributes that are not shared
+        new_board = Board.__new__(Board)
+        new_board.__dict__.update(self.__dict__)
         new_board._board_state = copy(self._board_state)
+        new_board._open_degree = copy(self._open_degree)
         return new_board
 
     def forecast_move(self, move):
@@ -139,9 +200,41 @@ class Board(object):
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
+        if self.bitboard:
+            return self._geometry.to_moves(self._geometry.full_mask & ~self._occupied)
         return [(i, j) for j in range(self.width) for i in range(self.height)
                 if self._board_state[i + j * self.height] == Board.BLANK]
 
+    def blank_count(self):
+        """Return the number of locations that are still available on the
+        board; equal to `len(get_blank_spaces())`, but O(1).
+        """
+        return self._blank_count
+
+    def occupancy(self):
+        """Return a list with one entry per cell, in flat cell index order
+        (`row + col * height`): 1 if the cell is blocked, 0 if it is blank.
+        """
+        return self._board_state[:self.width * self.height]
+
+    def get_open_degree(self, move):
+        """Return the number of blank cells a knight could move to from the
+        specified cell, i.e., the number of legal moves a player standing
+        on that cell would have. The counts are maintained incrementally, so
+        this is an O(1) lookup.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) of a cell on the board.
+
+        Returns
+        -------
+        int
+            The number of open knight neighbours of the cell.
+        """
+        return self._open_degree[move[0] + move[1] * self.height]
+
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
 
@@ -190,6 +283,34 @@ class Board(object):
             player = self.active_player
         return self.__get_moves(self.get_player_location(player))
 
+    def get_mobility(self, player):
+        """Return the legal moves of a player and of its opponent together
+        with the terminal status of the game, generating each move list only
+        once and without shuffling. This is equivalent to calling
+        `get_legal_moves()` for both players along with `utility()`, and is
+        intended for evaluation functions.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (list<(int, int)>, list<(int, int)>, float)
+            The legal moves of `player`, the legal moves of its opponent, and
+            the utility of the state for `player`: +inf if it has won, -inf if
+            it has lost, and 0 otherwise.
+        """
+        own_moves = self.__generate_moves(self.get_player_location(player))
+        opp_moves = self.__generate_moves(self.get_player_location(self.get_opponent(player)))
+
+        if player == self._active_player:
+            utility = 0. if own_moves else float("-inf")
+        else:
+            utility = 0. if opp_moves else float("inf")
+        return own_moves, opp_moves, utility
+
     def apply_move(self, move):
         """Move the active player to a specified location.
 
@@ -198,14 +319,64 @@ class Board(object):
         move : (int, int)
             A coordinate pair (row, column) indicating the next position for
             the active player on the board.
+
+        Returns
+        -------
+        (int, int or None)
+            An undo record holding the index of the newly blocked cell and
+            the previous location index of the player that moved; pass it
+            to `undo_move()` to restore the board to its prior state.
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        last_loc = self._board_state[-last_move_idx]
+        undo = (idx, last_loc)
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
+        self._occupied |= 1 << idx
+        self._zobrist ^= self.__zobrist_delta(idx, last_loc, last_move_idx)
+        open_degree = self._open_degree
+        for neighbor in self._geometry.knight_neighbors[idx]:
+            open_degree[neighbor] -= 1
+        self._blank_count -= 1
         self._board_state[-3] ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
+        return undo
+
+    def undo_move(self, undo):
+        """Take back the most recent move applied with `apply_move()`, in
+        place. Moves must be undone in the reverse order they were applied.
+
+        Parameters
+        ----------
+        undo : (int, int or None)
+            The undo record returned by the matching call to `apply_move()`.
+        """
+        idx, last_loc = undo
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._board_state[-last_move_idx] = last_loc
+        self._board_state[idx] = Board.BLANK
+        self._occupied &= ~(1 << idx)
+        self._zobrist ^= self.__zobrist_delta(idx, last_loc, last_move_idx)
+        open_degree = self._open_degree
+        for neighbor in self._geometry.knight_neighbors[idx]:
+            open_degree[neighbor] += 1
+        self._blank_count += 1
+        self._board_state[-3] ^= 1
+        self.move_count -= 1
+
+    def __zobrist_delta(self, idx, last_loc, last_move_idx):
+        """Return the Zobrist key change for the player at `last_move_idx`
+        moving from `last_loc` to cell `idx`; the change is its own inverse.
+        """
+        geometry = self._geometry
+        player_keys = geometry.zobrist_p1 if last_move_idx == 1 else geometry.zobrist_p2
+        delta = geometry.zobrist_cells[idx] ^ player_keys[idx] ^ geometry.zobrist_p2_to_move
+        if last_loc is not Board.NOT_MOVED:
+            delta ^= player_keys[last_loc]
+        return delta
 
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
@@ -254,13 +425,28 @@ class Board(object):
         if loc == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
+        valid_moves = self.__generate_moves(loc)
+        if self.shuffle:
+            self.random.shuffle(valid_moves)
+        return valid_moves
+
+    def __generate_moves(self, loc):
+        """Generate the list of possible moves from `loc` in a fixed order
+        (no shuffle), or the blank spaces if the player has not moved.
+        """
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        if self.bitboard:
+            geometry = self._geometry
+            return geometry.to_moves(
+                geometry.knight_masks[loc[0] + loc[1] * self.height] & ~self._occupied)
+
         r, c = loc
         directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
                       (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
-        return valid_moves
+        return [(r + dr, c + dc) for dr, dc in directions
+                if self.move_is_legal((r + dr, c + dc))]
 
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
@@ -295,15 +481,21 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, move_times=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
         Parameters
         ----------
-        time_limit : numeric (optional)
+        time_limit : numeric or None (optional)
             The maximum number of milliseconds to allow before timeout
-            during each turn.
+            during each turn. If None, there is no time limit: `time_left()`
+            always returns infinity and no player can lose on time, so the
+            players must bound their own search (e.g., by a node budget).
+
+        move_times : list (optional)
+            If given, the number of milliseconds taken by each call to
+            `get_move` is appended to this list.
 
         Returns
         ----------
@@ -322,14 +514,19 @@ class Board(object):
             game_copy = self.copy()
 
             move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
+            if time_limit is None:
+                time_left = lambda : float("inf")
+            else:
+                time_left = lambda : time_limit - (time_millis() - move_start)
             curr_move = self._active_player.get_move(game_copy, time_left)
-            move_end = time_left()
+            move_time = time_millis() - move_start
+            if move_times is not None:
+                move_times.append(move_time)
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
 
-            if move_end < 0:
+            if time_limit is not None and move_time > time_limit:
                 return self._inactive_player, move_history, "timeout"
 
             if curr_move not in legal_player_moves:
@@ -0,0 +1,62 @@
+"""Confidence intervals and sequential stopping rules for the win rate of
+one agent against another, estimated from a series of games.
+"""
+import math
+
+from statistics import NormalDist
+
+
+def wilson_interval(wins, games, confidence=0.95):
+    """Return the Wilson score interval (low, high) for the probability of
+    winning, given `wins` out of `games` games; (0, 1) if `games` is zero.
+    """
+    if games == 0:
+        return 0., 1.
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / games
+    denominator = 1 + z ** 2 / games
+    center = (p + z ** 2 / (2 * games)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / games + z ** 2 / (4 * games ** 2)) / denominator
+    return max(0., center - half_width), min(1., center + half_width)
+
+
+class SPRT:
+    """Wald's sequential probability ratio test of H0: p = 0.5 - margin
+    against H1: p = 0.5 + margin for the win probability p of a pairing.
+
+    The test can be checked after every game without inflating its error
+    rates: it decides once the log-likelihood ratio of the results leaves
+    the interval set by `confidence`, which bounds the probability of
+    picking the wrong side when the true win rate lies outside the
+    indifference region 0.5 +/- margin. Pairings inside the region
+    eventually stop too, with either answer.
+
+    Parameters
+    ----------
+    confidence : float (optional)
+        One minus the error rate allowed for each hypothesis.
+
+    margin : float (optional)
+        Half-width of the indifference region around a 50% win rate.
+    """
+
+    def __init__(self, confidence=0.95, margin=0.1):
+        self.confidence = confidence
+        self.margin = margin
+        error = 1 - confidence
+        self.lower = math.log(error / (1 - error))
+        self.upper = math.log((1 - error) / error)
+        p0, p1 = 0.5 - margin, 0.5 + margin
+        self._win_llr = math.log(p1 / p0)
+        self._loss_llr = math.log((1 - p1) / (1 - p0))
+
+    def llr(self, wins, losses):
+        """Return the log-likelihood ratio of H1 to H0 for the results. """
+        return wins * self._win_llr + losses * self._loss_llr
+
+    def decided(self, wins, losses):
+        """Return True once the results settle which side of 50% the win
+        rate is on.
+        """
+        llr = self.llr(wins, losses)
+        return llr <= self.lower or llr >= self.upper
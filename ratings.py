@@ -0,0 +1,133 @@
+"""Bradley-Terry ratings for a pool of agents, fitted from any set of game
+results and updated incrementally as games arrive.
+
+Each agent i has a strength theta_i and wins against agent j with
+probability 1 / (1 + exp(theta_j - theta_i)). The strengths are the
+maximum a posteriori estimate under a Gaussian prior (which keeps the
+ratings of unbeaten agents finite), and the curvature at the estimate
+gives a Gaussian approximation of their uncertainty. Ratings are reported
+on the Elo scale, where 400 points correspond to 10:1 odds.
+"""
+import itertools
+import math
+
+import numpy as np
+
+ELO_SCALE = 400 / math.log(10)  # Elo points per unit of strength
+
+
+class BradleyTerry:
+    """Bradley-Terry ratings of the agents seen so far.
+
+    Parameters
+    ----------
+    prior_sd : float (optional)
+        Standard deviation of the Gaussian prior on each strength, in Elo
+        points.
+
+    newton_steps : int (optional)
+        Number of Newton steps taken after each new game, starting from the
+        previous estimate; `fit()` iterates to convergence instead.
+    """
+
+    def __init__(self, prior_sd=400., newton_steps=2):
+        self.prior_precision = (ELO_SCALE / prior_sd) ** 2
+        self.newton_steps = newton_steps
+        self.agents = []
+        self._index = {}
+        self.wins = np.zeros((0, 0))
+        self.theta = np.zeros(0)
+        self._hessian = np.zeros((0, 0))
+
+    def add_agent(self, name):
+        """Add an agent with the prior rating of 0, if it is new. """
+        if name in self._index:
+            return
+        self._index[name] = len(self.agents)
+        self.agents.append(name)
+        self.wins = np.pad(self.wins, ((0, 1), (0, 1)))
+        self.theta = np.append(self.theta, 0.)
+        self._newton_step()
+
+    def add_game(self, winner, loser):
+        """Record one game and update the ratings. """
+        self.add_agent(winner)
+        self.add_agent(loser)
+        self.wins[self._index[winner], self._index[loser]] += 1
+        for _ in range(self.newton_steps):
+            self._newton_step()
+
+    def update(self, records):
+        """Record the games of an iterable of `tournament_log` records. """
+        for record in records:
+            loser = record["cpu_agent"] if record["test_won"] else record["test_agent"]
+            self.add_game(record["winner"], loser)
+
+    def fit(self, tolerance=1e-9, max_steps=100):
+        """Iterate Newton's method until the strengths stop changing. """
+        for _ in range(max_steps):
+            if self._newton_step() < tolerance:
+                break
+
+    def _newton_step(self):
+        """Take one Newton step towards the MAP strengths, refresh the
+        Hessian, and return the largest change in strength.
+        """
+        games = self.wins + self.wins.T
+        p = 1 / (1 + np.exp(self.theta[None, :] - self.theta[:, None]))
+        gradient = (self.wins - games * p).sum(axis=1) - self.prior_precision * self.theta
+        weights = games * p * (1 - p)
+        hessian = weights - np.diag(weights.sum(axis=1)) - self.prior_precision * np.eye(len(self.theta))
+        step = np.linalg.solve(hessian, gradient)
+        self.theta = self.theta - step
+        self._hessian = hessian
+        return float(np.abs(step).max())
+
+    def rating(self, name):
+        """Return the Elo rating of an agent. """
+        return ELO_SCALE * self.theta[self._index[name]]
+
+    def ratings(self):
+        """Return a list of (name, Elo rating, standard error) tuples, from
+        the strongest agent to the weakest.
+        """
+        sd = ELO_SCALE * np.sqrt(np.diag(self.covariance()))
+        table = [(name, self.rating(name), sd[i]) for i, name in enumerate(self.agents)]
+        return sorted(table, key=lambda row: -row[1])
+
+    def covariance(self):
+        """Return the approximate posterior covariance of the strengths. """
+        return np.linalg.inv(-self._hessian)
+
+    def win_probability(self, a, b):
+        """Return the estimated probability that agent `a` beats agent `b`. """
+        return 1 / (1 + math.exp(self.theta[self._index[b]] - self.theta[self._index[a]]))
+
+    def information_gain(self, a, b, covariance=None):
+        """Return the expected reduction in entropy (in nats) of the
+        strength difference of `a` and `b` from playing one more game
+        between them.
+
+        A game is worth p * (1 - p) units of Fisher information about the
+        difference, where p is the win probability, so the gain is largest
+        for closely matched agents whose relative strength is uncertain.
+        """
+        if covariance is None:
+            covariance = self.covariance()
+        i, j = self._index[a], self._index[b]
+        variance = covariance[i, i] + covariance[j, j] - 2 * covariance[i, j]
+        p = self.win_probability(a, b)
+        return 0.5 * math.log1p(variance * p * (1 - p))
+
+    def next_pairing(self, pairings=None):
+        """Return the pairing with the largest expected information gain.
+
+        Parameters
+        ----------
+        pairings : iterable of (name, name) (optional)
+            The pairings allowed; by default every pair of agents.
+        """
+        if pairings is None:
+            pairings = itertools.combinations(self.agents, 2)
+        covariance = self.covariance()
+        return max(pairings, key=lambda pair: self.information_gain(*pair, covariance=covariance))
@@ -11,11 +11,17 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
+import contextlib
+import copy
+import functools
 import itertools
+import os
 import random
 import warnings
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from isolation import Board
 from sample_players import (RandomPlayer, open_move_score,
@@ -23,9 +29,14 @@ from sample_players import (RandomPlayer, open_move_score,
 # from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
 #                         custom_score_2, custom_score_3)
 import game_agent
+from calibration import calibrate
+from match_stats import SPRT, wilson_interval
+from ratings import BradleyTerry
+from tournament_log import GAME_KEY_FIELDS, LogReader, append_record, game_key, open_log
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
+SPRT_MARGIN = 0.1  # win rates within 50% +/- this margin count as a tie
 
 DESCRIPTION = """
 This script evaluates the performance of the custom_score evaluation
@@ -37,39 +48,243 @@ game_agent.py.
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+# One game of a tournament schedule; the fields are the arguments of
+# `play_game`, in order
+ScheduledGame = namedtuple("ScheduledGame", ["cpu_agent", "test_agent", "opening", "test_seat",
+                                             "time_limit", "match", "seed", "time_scale"])
+
+
+def random_opening(rng=random):
+    """Return a random first move for each player, shared by every game of
+    one match so that all agents start from the same position. The moves
+    only depend on the state of `rng`.
+    """
+    board = Board("Player1", "Player2", shuffle=False)
+    opening = []
+    for _ in range(2):
+        move = rng.choice(board.get_legal_moves())
+        board.apply_move(move)
+        opening.append(move)
+    return opening
+
+
+def search_stats(player):
+    """Return the (moves, nodes, depth) totals kept by players that record
+    search statistics (see `AlphaBetaPlayer`), or zeros for other players.
+    """
+    return tuple(getattr(player, name, 0) for name in ("total_moves", "total_nodes", "total_depth"))
+
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def game_seed(seed, cpu_name, test_name, match, test_seat):
+    """Return the seed of the random number generator of one scheduled game
+    of a tournament seeded with `seed`, or None if it is unseeded.
+
+    The seed is a string, which `random.Random` turns into the same state
+    in every process, whatever its hash randomization.
+    """
+    if seed is None:
+        return None
+    return "{}:{}:{}:{}:{}".format(seed, cpu_name, test_name, match, test_seat)
+
+
+def scheduled_key(game):
+    """Return the `game_key` that the record of a `ScheduledGame` will
+    have, without playing it.
+    """
+    fields = {"seed": game.seed, "time_limit": game.time_limit, "cpu_agent": game.cpu_agent.name,
+              "test_agent": game.test_agent.name, "match": game.match, "test_seat": game.test_seat}
+    return tuple(fields[field] for field in GAME_KEY_FIELDS)
+
+
+def play_game(cpu_agent, test_agent, opening, test_seat, time_limit=TIME_LIMIT, match=0, seed=None,
+              time_scale=1.):
+    """Play a single game from `opening` with the test agent as player 1
+    (`test_seat` 0) or player 2 (`test_seat` 1).
+
+    This is the unit of work scheduled on the process pool, so it returns
+    everything the tournament needs instead of updating shared state.
+    `match` and `seed` label the record (see `game_key`); if `seed` is
+    given, the board's random number generator is seeded from the game's
+    place in the schedule (see `game_seed`), so the same game replays the
+    same way in any process, given the same search at every move. The time
+    limit is given in reference milliseconds, and each move is allowed
+    `time_limit * time_scale` milliseconds of wall-clock time on this
+    machine (see `calibration`).
+
+    Returns
+    -------
+    dict
+        The game record described in `tournament_log`.
+    """
+    # Play fresh copies of the agents, as a worker process would, so that
+    # search state left by earlier games (history scores, tables) cannot
+    # change how this one is played
+    cpu_player, test_player = copy.deepcopy((cpu_agent.player, test_agent.player))
+    players = [cpu_player, cpu_player]
+    players[test_seat] = test_player
+    game = Board(*players, seed=game_seed(seed, cpu_agent.name, test_agent.name, match, test_seat))
+    for move in opening:
+        game.apply_move(move)
+    stats_before = search_stats(test_player)
+    move_times = []
+    wall_time_limit = time_limit * time_scale if time_limit is not None else None
+    winner, _, termination = game.play(time_limit=wall_time_limit, move_times=move_times)
+    searches, nodes, depth = (a - b for a, b in zip(search_stats(test_player), stats_before))
+    test_won = winner is test_player
+    return {
+        "seed": seed,
+        "time_limit": time_limit,
+        "time_scale": time_scale,
+        "match": match,
+        "cpu_agent": cpu_agent.name,
+        "test_agent": test_agent.name,
+        "test_seat": test_seat,
+        "opening": [list(move) for move in opening],
+        "winner": test_agent.name if test_won else cpu_agent.name,
+        "test_won": test_won,
+        "termination": termination,
+        "move_count": game.move_count,
+        "move_times": [round(t, 3) for t in move_times],
+        "test_searches": searches,
+        "test_nodes": nodes,
+        "test_depth": depth,
+    }
+
+
+def available_cpus():
+    """Return the number of cores this process may run on. """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches, executor=None, log=None,
+               stop_rule=None, rng=random, seed=None, completed=None, time_limit=TIME_LIMIT,
+               time_scale=1.):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    Every game is independent, so when `executor` is given (see
+    `play_matches`) they are all submitted to it at once. Each game is
+    played by copies of the agents (see `play_game`), and the search
+    statistics in its record are added to the test agent. The record of
+    each game is appended to the open file `log`, if given, as soon as it
+    finishes, but the results are tallied in schedule order whatever order
+    they finish in.
+
+    If `stop_rule` is given (see `match_stats.SPRT`), it is checked after
+    each match, once the test agent has played both seats of the opening,
+    and the agent stops playing the cpu agent when
+    `stop_rule.decided(wins, losses)`; its remaining games are dropped,
+    or ignored if they have already been played.
+
+    The openings are drawn from `rng`, and `seed` labels the game records.
+    Each move is limited to `time_limit` reference milliseconds, scaled by
+    `time_scale` (None for no limit, see `play_game`).
+    Games whose `game_key` is in `completed` (records from an earlier run
+    with the same seed) are not played again: their recorded results are
+    tallied first.
+
+    Returns
+    -------
+    (int, int, dict)
+        The number of timeouts, the number of games forfeited by test
+        agents, and the number of games played by each test agent.
     """
     timeout_count = 0
     forfeit_count = 0
-    for _ in range(num_matches):
-
-        games = sum(
-            [[Board(cpu_agent.player, agent.player), Board(agent.player, cpu_agent.player)] for agent in test_agents],
-            [])
-
-        # initialize all games with a random move and response
-        for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
-            for game in games:
-                game.apply_move(move)
-
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
-
-        if termination == "timeout":
+    played = {agent.player: 0 for agent in test_agents}
+    settled = set()
+    completed = completed or {}
+
+    games = []
+    for match in range(num_matches):
+        opening = random_opening(rng)
+        for agent in test_agents:
+            for test_seat in (1, 0):
+                games.append(ScheduledGame(cpu_agent, agent, opening, test_seat, time_limit, match, seed,
+                                           time_scale))
+
+    keys = [scheduled_key(game) for game in games]
+
+    def finished(record):
+        if log is not None:
+            append_record(log, record)
+        return record
+
+    def results():
+        """Yield (index, record) for the games in schedule order,
+        skipping the games of settled agents."""
+        if executor is None:
+            for index, game in enumerate(games):
+                if game.test_agent.name in settled:
+                    continue
+                if keys[index] in completed:
+                    yield index, completed[keys[index]]
+                else:
+                    yield index, finished(play_game(*game))
+            return
+
+        futures = {executor.submit(play_game, *game): index for index, game in enumerate(games)
+                   if keys[index] not in completed}
+        done = {}
+        next_index = 0
+
+        def in_order():
+            # release the results that are next in the schedule
+            nonlocal next_index
+            while next_index < len(games):
+                index, name = next_index, games[next_index].test_agent.name
+                if name in settled:
+                    next_index += 1
+                elif keys[index] in completed:
+                    next_index += 1
+                    yield index, completed[keys[index]]
+                elif index in done:
+                    next_index += 1
+                    yield index, done.pop(index)
+                else:
+                    return
+                if name in settled:
+                    for future, other in futures.items():
+                        if games[other].test_agent.name == name:
+                            future.cancel()
+
+        yield from in_order()
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            done[futures[future]] = finished(future.result())
+            yield from in_order()
+
+    # tally the results in schedule order, so that the same games are
+    # counted whatever order they finish in
+    agents = {agent.name: agent for agent in test_agents}
+    for index, record in results():
+        agent = agents[record["test_agent"]]
+        win_counts[agent.player if record["test_won"] else cpu_agent.player] += 1
+        played[agent.player] += 1
+        for name, field in [("total_moves", "test_searches"), ("total_nodes", "test_nodes"),
+                            ("total_depth", "test_depth")]:
+            if hasattr(agent.player, name):
+                setattr(agent.player, name, getattr(agent.player, name) + record[field])
+
+        if record["termination"] == "timeout":
             timeout_count += 1
-        elif winner not in test_agents and termination == "forfeit":
+        elif not record["test_won"] and record["termination"] == "forfeit":
             forfeit_count += 1
 
-    return timeout_count, forfeit_count
+        # only stop between matches, once the agent has played both seats
+        # of the opening
+        wins = win_counts[agent.player]
+        if (stop_rule is not None and games[index].test_seat == 0
+                and stop_rule.decided(wins, played[agent.player] - wins)):
+            settled.add(agent.name)
+
+    return timeout_count, forfeit_count, played
 
 
 def update(total_wins, wins):
@@ -78,15 +293,62 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
-
+def play_matches(cpu_agents, test_agents, num_matches, workers=1, log_path=None,
+                 confidence=0.95, early_stop=False, seed=None, resume=False, time_limit=TIME_LIMIT,
+                 time_scale=1.):
+    """Play matches between the test agent and each cpu_agent individually.
+
+    With `workers` > 1 the games are played in parallel on a pool of that
+    many processes, each playing one game at a time. Under a wall-clock
+    `time_limit` the pool is never larger than the number of available
+    cores; with `time_limit=None` (agents limited by node budgets or depth,
+    see `AlphaBetaPlayer`) the results do not depend on machine load, so
+    any number of workers may share the cores. `time_scale` converts the
+    time limit from reference milliseconds to milliseconds on this machine
+    (see `calibration.calibrate`) and is recorded in the game log.
+
+    If `log_path` is given, a record of every game is appended to that file
+    as the game finishes (see `tournament_log`).
+
+    Each win rate is reported with its Wilson interval at `confidence`.
+    With `early_stop`, `num_matches` becomes an upper bound: a pairing
+    stops once an `SPRT` at the same confidence settles whether the test
+    agent wins more or less than half of its games against that opponent.
+
+    A `seed` fixes the openings of every match. With `resume`, the games
+    already recorded in `log_path` by a run with the same seed and time
+    limit are tallied from the log instead of being played again, so an
+    interrupted tournament can be restarted with the same arguments.
+    """
+    if resume and (log_path is None or seed is None):
+        raise ValueError("Resuming a tournament requires a log and a seed.")
+    if time_limit is not None and workers > available_cpus():
+        warnings.warn("Using {} workers instead of {} to leave one game per core.".format(
+            available_cpus(), workers))
+        workers = available_cpus()
+    completed = {}
+    if resume:
+        completed = {game_key(record): record for record in LogReader(log_path).read()}
+    with contextlib.ExitStack() as stack:
+        _play_matches(
+            cpu_agents, test_agents, num_matches, confidence,
+            executor=stack.enter_context(ProcessPoolExecutor(max_workers=workers)) if workers > 1 else None,
+            log=stack.enter_context(open_log(log_path)) if log_path else None,
+            stop_rule=SPRT(confidence, SPRT_MARGIN) if early_stop else None,
+            rng=random.Random(seed) if seed is not None else random,
+            seed=seed, completed=completed, time_limit=time_limit, time_scale=time_scale)
+
+
+def _play_matches(cpu_agents, test_agents, num_matches, confidence=0.95, **round_options):
+    """Play and tabulate the tournament; `round_options` are passed on to
+    `play_round`.
+    """
     N_test_agents = len(test_agents)
 
     total_wins = {agent.player: 0 for agent in test_agents}
+    total_played = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
-    total_matches = 2 * num_matches * len(cpu_agents)
 
     template_names = "\n{:^9}{:^13}" + "{:^13}" * N_test_agents
     print(template_names.format("Match #", "Opponent", *[x.name for x in test_agents]))
@@ -102,20 +364,33 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, **round_options)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
-        _total = 2 * num_matches
-        round_totals = sum([[wins[agent.player], _total - wins[agent.player]]
+        total_played = update(total_played, counts[2])
+        round_totals = sum([[wins[agent.player], counts[2][agent.player] - wins[agent.player]]
                             for agent in test_agents], [])
         template_results = " {:^5}| {:^5}" * N_test_agents
         print(template_results.format(*round_totals))
 
     print("-" * (9 + 13 + 13 * N_test_agents))
-    print(("{:^9}{:^13}" + "{:^13}" * N_test_agents + "\n").format(
-        "", "Win Rate:", *["{:.1f}%".format(100 * total_wins[a.player] / total_matches) for a in test_agents]
+    print(("{:^9}{:^13}" + "{:^13}" * N_test_agents).format(
+        "", "Win Rate:", *["{:.1f}%".format(100 * total_wins[a.player] / total_played[a.player])
+                           for a in test_agents]
+    ))
+    intervals = [wilson_interval(total_wins[a.player], total_played[a.player], confidence)
+                 for a in test_agents]
+    print(("{:^9}{:^13}" + "{:^13}" * N_test_agents).format(
+        "", "{:.0f}% CI:".format(100 * confidence),
+        *["{:.1f}-{:.1f}%".format(100 * low, 100 * high) for low, high in intervals]
     ))
+    if round_options.get("stop_rule") is not None:
+        print(("{:^9}{:^13}" + "{:^13}" * N_test_agents).format(
+            "", "Games:", *[total_played[a.player] for a in test_agents]))
+    print()
+
+    print_search_stats(test_agents)
 
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
@@ -127,16 +402,102 @@ def play_matches(cpu_agents, test_agents, num_matches):
                "legal moves available to play.\n").format(total_forfeits))
 
 
-import functools
+def print_search_stats(test_agents):
+    """Print the average depth completed and nodes searched per move by each
+    test agent that keeps search statistics (see `AlphaBetaPlayer`).
+    """
+    N_test_agents = len(test_agents)
+    depths, nodes = [], []
+    for agent in test_agents:
+        moves = getattr(agent.player, "total_moves", 0)
+        if moves:
+            depths.append("{:.2f}".format(agent.player.total_depth / moves))
+            nodes.append("{:.0f}".format(agent.player.total_nodes / moves))
+        else:
+            depths.append("-")
+            nodes.append("-")
+    print(("{:^9}{:^13}" + "{:^13}" * N_test_agents).format("", "Depth/move:", *depths))
+    print(("{:^9}{:^13}" + "{:^13}" * N_test_agents + "\n").format("", "Nodes/move:", *nodes))
+
+
+def play_rated(agents, num_matches, log_path=None, seed=None, time_limit=TIME_LIMIT, time_scale=1.):
+    """Rate a pool of agents with Bradley-Terry ratings, choosing each match
+    by expected information gain (see `ratings.BradleyTerry`) instead of
+    playing every pairing. Each match is a pair of games from the same
+    random opening with the seats swapped.
+
+    Returns
+    -------
+    `ratings.BradleyTerry`
+        The ratings after the last match; they are also printed.
+    """
+    rng = random.Random(seed) if seed is not None else random
+    agents_by_name = {agent.name: agent for agent in agents}
+    bt = BradleyTerry()
+    for agent in agents:
+        bt.add_agent(agent.name)
+
+    with contextlib.ExitStack() as stack:
+        log = stack.enter_context(open_log(log_path)) if log_path else None
+        for match in range(num_matches):
+            test_name, cpu_name = bt.next_pairing()
+            opening = random_opening(rng)
+            for test_seat in (1, 0):
+                record = play_game(agents_by_name[cpu_name], agents_by_name[test_name], opening, test_seat,
+                                   time_limit, match, seed, time_scale)
+                bt.update([record])
+                if log is not None:
+                    append_record(log, record)
+
+    print("\n{:^9}{:^17}{:^9}{:^9}".format("Rank", "Agent", "Elo", "+/-"))
+    for rank, (name, elo, sd) in enumerate(bt.ratings()):
+        print("{:^9}{:^17}{:^9.0f}{:^9.0f}".format(rank + 1, name, elo, sd))
+    print()
+    return bt
 
 
 def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of games to play in parallel (at most one per core)")
+    parser.add_argument("-l", "--log", metavar="PATH",
+                        help="append a JSON record of every game to this file")
+    parser.add_argument("-c", "--confidence", type=float, default=0.95,
+                        help="confidence level of the win rate intervals and early stopping")
+    parser.add_argument("-e", "--early-stop", action="store_true",
+                        help="stop each pairing once its winner is statistically settled")
+    parser.add_argument("-s", "--seed", type=int,
+                        help="seed of the random openings")
+    parser.add_argument("-r", "--resume", action="store_true",
+                        help="skip the games already in the log from a run with the same seed")
+    parser.add_argument("-n", "--node-budget", type=int,
+                        help="limit every alpha-beta agent to this many nodes per move instead of the time limit")
+    parser.add_argument("-d", "--depth-limit", type=int,
+                        help="limit every alpha-beta agent to this search depth instead of the time limit")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="scale the time limit by the speed of this machine relative to the reference")
+    parser.add_argument("--rated", type=int, metavar="MATCHES",
+                        help="instead of the tournament, rate all agents with this many "
+                             "adaptively scheduled matches")
+    args = parser.parse_args()
+    if args.rated:
+        # Rated play picks each pairing from the results so far and plays
+        # one game at a time; it has no worker pool, stopping rule or resume
+        ignored = [flag for flag, used in [("--workers", args.workers != 1),
+                                           ("--confidence", args.confidence != parser.get_default("confidence")),
+                                           ("--early-stop", args.early_stop),
+                                           ("--resume", args.resume)] if used]
+        if ignored:
+            parser.error("--rated cannot be combined with " + ", ".join(ignored))
+
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
     test_agents = [
         # Agent(game_agent.AlphaBetaPlayer(score_fn=game_agent.score_look_ahead_agg), "LA_opp"),
 
         Agent(game_agent.AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
+        Agent(game_agent.AlphaBetaPlayer(score_fn=improved_score, pvs=True), "PVS_Improved"),
+        Agent(game_agent.MTDfPlayer(score_fn=improved_score), "MTDf_Improved"),
         # Agent(game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score), "AB_Custom"),
         # Agent(game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2), "AB_Custom_2"),
         # Agent(game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_3), "AB_Custom_3")
@@ -185,11 +546,33 @@ def main():
     ]
     cpu_agents = cpu_agents[::-1]
 
+    time_limit = TIME_LIMIT
+    if args.node_budget or args.depth_limit:
+        time_limit = None
+        for agent in test_agents + cpu_agents:
+            if isinstance(agent.player, game_agent.AlphaBetaPlayer):
+                agent.player.node_budget = args.node_budget
+                agent.player.depth_limit = args.depth_limit
+
+    time_scale = 1.
+    if args.calibrate and time_limit is not None:
+        time_scale, nps = calibrate()
+        print("Calibration: {:.0f} nodes/s, {:.0f} reference ms = {:.0f} ms on this machine".format(
+            nps, time_limit, time_limit * time_scale))
+
+    if args.rated:
+        pool = test_agents + [a for a in cpu_agents if a.name not in {t.name for t in test_agents}]
+        play_rated(pool, args.rated, log_path=args.log, seed=args.seed, time_limit=time_limit,
+                   time_scale=time_scale)
+        return
+
     print(DESCRIPTION)
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    play_matches(cpu_agents, test_agents, NUM_MATCHES, workers=args.workers, log_path=args.log,
+                 confidence=args.confidence, early_stop=args.early_stop,
+                 seed=args.seed, resume=args.resume, time_limit=time_limit, time_scale=time_scale)
 
 
 if __name__ == "__main__":
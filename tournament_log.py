@@ -0,0 +1,147 @@
+"""Read and write the per-game records streamed by tournament.py.
+
+A log holds one JSON object per line (JSON Lines), appended and flushed as
+soon as each game finishes, so it can be read and summarized while the
+tournament writing it is still running. Each record has the fields
+
+    seed : seed of the tournament schedule (None if unseeded)
+    time_limit : reference milliseconds allowed per move (None if unlimited)
+    time_scale : wall-clock milliseconds per reference millisecond on the
+        machine that played the game (see `calibration`)
+    match : index of the opening among the matches against this cpu agent
+    cpu_agent, test_agent : names of the two agents
+    test_seat : 0 if the test agent was player 1, 1 if it was player 2
+    opening : the two random opening moves, as [row, column] pairs
+    winner : name of the winning agent
+    test_won : whether the test agent won
+    termination : the reason for losing reported by `Board.play`
+    move_count : number of moves in the game, including the opening
+    move_times : milliseconds taken by each call to `get_move` after the
+        opening, ending with the losing call
+    test_searches, test_nodes, test_depth : number of searches, nodes
+        searched and total depth completed by the test agent (zero for
+        agents that do not record search statistics)
+"""
+import json
+import os
+
+from collections import OrderedDict
+
+# Fields identifying a scheduled game, shared by every run of a tournament
+# with the same seed (see `game_key`)
+GAME_KEY_FIELDS = ("seed", "time_limit", "cpu_agent", "test_agent", "match", "test_seat")
+
+
+def game_key(record):
+    """Return the key of the scheduled game a record belongs to. """
+    return tuple(record.get(field) for field in GAME_KEY_FIELDS)
+
+
+def open_log(path):
+    """Open a log for appending. If the last record was cut short (e.g.,
+    the writer was killed), start a new line so that it cannot corrupt the
+    next record.
+    """
+    stream = open(path, "a")
+    if stream.tell() > 0:
+        with open(path, "rb") as log:
+            log.seek(-1, os.SEEK_END)
+            if log.read(1) != b"\n":
+                stream.write("\n")
+    return stream
+
+
+def append_record(stream, record):
+    """Write one game record to an open log and sync it to disk, so that
+    it survives the process or the machine going down.
+    """
+    stream.write(json.dumps(record) + "\n")
+    stream.flush()
+    os.fsync(stream.fileno())
+
+
+class LogReader:
+    """Read the records of a log incrementally: each call to `read()`
+    returns only the records appended since the previous call. A partly
+    written last line is left for the next call, and lines that are not
+    valid records (cut short by a crash) are skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path of the log file; it does not need to exist yet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def read(self):
+        """Return the list of new complete records in the log. """
+        records = []
+        try:
+            with open(self.path, "rb") as log:
+                log.seek(self.offset)
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.offset += len(line)
+                    try:
+                        records.append(json.loads(line.decode("utf-8")))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+
+def read_logs(paths):
+    """Return every record in the logs at `paths`. """
+    return [record for path in paths for record in LogReader(path).read()]
+
+
+class WinTable:
+    """Games won by each test agent against each cpu agent, updated one
+    record at a time. Agents are listed in the order they first appear.
+    """
+
+    def __init__(self, records=()):
+        self.won = OrderedDict()
+        self.played = OrderedDict()
+        self.cpu_agents = []
+        self.update(records)
+
+    def update(self, records):
+        """Add the results of an iterable of game records. """
+        for record in records:
+            test, cpu = record["test_agent"], record["cpu_agent"]
+            if cpu not in self.cpu_agents:
+                self.cpu_agents.append(cpu)
+            won = self.won.setdefault(test, {})
+            played = self.played.setdefault(test, {})
+            won[cpu] = won.get(cpu, 0) + record["test_won"]
+            played[cpu] = played.get(cpu, 0) + 1
+
+    @property
+    def test_agents(self):
+        return list(self.won)
+
+    def win_counts(self):
+        """Return a dict mapping each test agent to its list of wins against
+        each of `cpu_agents`.
+        """
+        return {test: [won.get(cpu, 0) for cpu in self.cpu_agents]
+                for test, won in self.won.items()}
+
+    def win_percentages(self):
+        """Return a dict mapping each test agent to its list of win
+        percentages against each of `cpu_agents` (None if they never met).
+        """
+        return {test: [100. * won[cpu] / self.played[test][cpu] if cpu in won else None
+                       for cpu in self.cpu_agents]
+                for test, won in self.won.items()}
+
+    def win_rate(self, test_agent):
+        """Return the overall fraction of games won by `test_agent`. """
+        played = sum(self.played[test_agent].values())
+        return sum(self.won[test_agent].values()) / played